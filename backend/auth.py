@@ -49,7 +49,8 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 #Current user dependency
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def user_from_token(db: Session, token: str) -> User:
+    """Korisnik iz JWT tokena (sinkrono, izvan dependencyja npr. u middlewareu)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Neuspjela autentikacija.",
@@ -69,6 +70,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     return user
 
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    return user_from_token(db, token)
+
 #Routes
 @router.post("/register", response_model=UserRead, status_code=201)
 def register(user_in: UserCreate, db: Session = Depends(get_db)):
@@ -2,8 +2,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
-# Putanja do SQLite baze (blog.db u root folderu projekta)
-DB_FILE = os.path.join(os.path.dirname(__file__), "..", "blog.db")
+# Putanja do SQLite baze (blog.db u root folderu projekta, BLOG_DB ju nadjačava)
+DB_FILE = os.getenv("BLOG_DB", os.path.join(os.path.dirname(__file__), "..", "blog.db"))
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_FILE}"
 
 # Konekcija prema SQLite bazi
@@ -19,5 +19,8 @@ Base = declarative_base()
 
 # Kreiraj tablice ako ne postoje
 def init_db():
-    from backend.models import Post, User
+    from backend.models import Post, User, CategoryFacet, MonthFacet
     Base.metadata.create_all(bind=engine, checkfirst=True)
+    # create_all preskače postojeće tablice, pa indekse dodane kasnije stvaramo zasebno
+    for ix in Post.__table__.indexes:
+        ix.create(bind=engine, checkfirst=True)
@@ -1,87 +1,600 @@
+import hashlib
+import math
 import os
+import re
 import threading
-from typing import List, Dict, Any
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from backend import metrics
 
 # Minimalni prag sličnosti rezultata
 EMB_MIN_SCORE = float(os.getenv("EMB_MIN_SCORE", "0.50"))
 
+# Hibridna pretraga (BM25 + vektori, reciprocal rank fusion)
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+RRF_K = int(os.getenv("RRF_K", "60"))
+# broj kandidata koje svaka metoda donosi u fuziju (najmanje top_k)
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "100"))
+# upit je "selektivan" ako leksički pogađa najviše ovaj udio dokumenata;
+# tada se vektorski boduju samo leksički kandidati
+HYBRID_PRUNE_RATIO = float(os.getenv("HYBRID_PRUNE_RATIO", "0.2"))
+
+# Dugi postovi se dijele na preklapajuće chunkove (u riječima); MiniLM inače
+# reže tekst nakon ~256 tokena. EMB_CHUNK_WORDS=0 = jedan vektor po postu.
+EMB_CHUNK_WORDS = int(os.getenv("EMB_CHUNK_WORDS", "120"))
+EMB_CHUNK_OVERLAP = int(os.getenv("EMB_CHUNK_OVERLAP", "30"))
+EMB_BATCH_SIZE = int(os.getenv("EMB_BATCH_SIZE", "64"))
+
+# Generacije indeksa: oznaka je model + verzija pipelinea (_norm, chunking).
+# Promjena bilo čega od toga traži novu generaciju (vidi start_reindex).
+EMB_MODEL_NAME = os.getenv("EMB_MODEL_NAME", "all-MiniLM-L6-v2")
+EMB_INDEX_VERSION = os.getenv("EMB_INDEX_VERSION", "2")
+# pozadinski reindeks: postova po batchu i najviše batcheva u sekundi (0 = bez ograničenja)
+EMB_REINDEX_BATCH_DOCS = int(os.getenv("EMB_REINDEX_BATCH_DOCS", "32"))
+EMB_REINDEX_MAX_BATCHES_PER_SEC = float(os.getenv("EMB_REINDEX_MAX_BATCHES_PER_SEC", "2"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class BM25Index:
+    """Invertirani indeks s BM25 bodovanjem; retci odgovaraju retcima _documents.
+
+    Nije thread-safe sam po sebi, koristi se pod lockom generacije.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.doc_len: List[int] = []
+        self.total_len = 0
+        self._doc_len_arr: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, text: str) -> int:
+        row = len(self.doc_len)
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            rows, tfs = self.postings.setdefault(term, ([], []))
+            rows.append(row)
+            tfs.append(tf)
+        self.doc_len.append(len(tokens))
+        self.total_len += len(tokens)
+        self._doc_len_arr = None
+        return row
+
+    def search(self, terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vraća (retci, BM25 bodovi) za sve dokumente koji sadrže barem jedan termin."""
+        n = len(self.doc_len)
+        hits = [self.postings[t] for t in dict.fromkeys(terms) if t in self.postings]
+        if n == 0 or not hits:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if self._doc_len_arr is None:
+            self._doc_len_arr = np.asarray(self.doc_len, dtype=np.float32)
+        avgdl = self.total_len / n if self.total_len else 1.0
+        scores = np.zeros(n, dtype=np.float32)
+        for rows, tfs in hits:
+            r = np.asarray(rows, dtype=np.int64)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1.0 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self._doc_len_arr[r] / avgdl)
+            scores[r] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        rows = np.flatnonzero(scores)
+        return rows, scores[rows]
+
+
+
 # Globalni resursi
 _model_lock = threading.Lock()
-_model = None
+_models: Dict[str, Any] = {}
 
-_documents: List[Dict[str, Any]] = []
-_embeddings: np.ndarray = np.zeros((0, 384), dtype=np.float32)
+# LRU cache embeddinga upita (ključ je model + normalizirani upit)
+EMB_QUERY_CACHE_SIZE = int(os.getenv("EMB_QUERY_CACHE_SIZE", "256"))
+_query_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_query_cache_lock = threading.Lock()
 
-# Thread-sigurnost za index strukture
-_index_lock = threading.Lock()
+def get_model(name: Optional[str] = None):
+    name = name or EMB_MODEL_NAME
+    with _model_lock:
+        if name not in _models:
+            # lijeni import: benchmark može podmetnuti vlastiti encoder (set_model)
+            from sentence_transformers import SentenceTransformer
+            _models[name] = SentenceTransformer(name)
+        return _models[name]
 
-def get_model():
-    global _model
+def set_model(model, name: Optional[str] = None):
+    # podmeće encoder (isto sučelje kao SentenceTransformer.encode), npr. za benchmark
     with _model_lock:
-        if _model is None:
-            _model = SentenceTransformer("all-MiniLM-L6-v2") 
-        return _model
+        _models[name or EMB_MODEL_NAME] = model
+    with _query_cache_lock:
+        _query_cache.clear()
+
+def _encode(texts: List[str], kind: str, model_name: Optional[str] = None) -> np.ndarray:
+    model = get_model(model_name)
+    t0 = time.perf_counter()
+    emb = model.encode(
+        texts,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    ).astype(np.float32)  # (N, D)
+    metrics.ENCODE_LATENCY.observe(time.perf_counter() - t0, kind=kind)
+    metrics.ENCODE_BATCH_SIZE.observe(len(texts), kind=kind)
+    return emb
+
+def _encode_query(q_norm: str, model_name: Optional[str] = None) -> np.ndarray:
+    key = (model_name or EMB_MODEL_NAME, q_norm)
+    with _query_cache_lock:
+        qv = _query_cache.get(key)
+        if qv is not None:
+            _query_cache.move_to_end(key)
+    metrics.cache_result("query_embedding", qv is not None)
+    if qv is not None:
+        return qv
+    qv = _encode([q_norm], "query", key[0])
+    if EMB_QUERY_CACHE_SIZE > 0:
+        with _query_cache_lock:
+            _query_cache[key] = qv
+            while len(_query_cache) > EMB_QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+    return qv
 
 def _norm(s: str) -> str:
     if not s:
         return ""
     return " ".join(s.split()).casefold()
 
-def clear_index():
-    global _documents, _embeddings
-    with _index_lock:
-        _documents = []
-        _embeddings = np.zeros((0, 384), dtype=np.float32)
+def tokenize(s: str) -> List[str]:
+    return _TOKEN_RE.findall(_norm(s))
 
-def add_doc_to_index(doc_id: int, title: str, content: str, category: str):
-    global _documents, _embeddings
-    text_for_embedding = _norm(f"{title}. {content}")
-    model = get_model()
-    emb = model.encode(
-        [text_for_embedding],
-        convert_to_numpy=True,
-        normalize_embeddings=True
-    ).astype(np.float32)  # (1, D)
-    with _index_lock:
-        _embeddings = emb if _embeddings.size == 0 else np.vstack([_embeddings, emb])
-        _documents.append({
-            "id": doc_id,
-            "title": title,
-            "content": content,
-            "category": category
-        })
-
-def search_index(query: str, top_k: int = 5):
-    global _documents, _embeddings
-    if len(_documents) == 0:
-        return []
+def chunk_text(title: str, content: str, size: Optional[int] = None,
+               overlap: Optional[int] = None) -> List[str]:
+    """Dijeli post na preklapajuće chunkove; naslov se dodaje svakom chunku kao kontekst."""
+    size = EMB_CHUNK_WORDS if size is None else size
+    overlap = EMB_CHUNK_OVERLAP if overlap is None else overlap
+    title_n = _norm(title)
+    words = _norm(content).split()
+    if size <= 0 or len(words) <= size:
+        return [_norm(f"{title}. {content}")]
+    step = max(1, size - max(0, overlap))
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(f"{title_n}. " + " ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
 
-    q_norm = _norm(query)
-    model = get_model()
-    qv = model.encode(
-        [q_norm],
-        convert_to_numpy=True,
-        normalize_embeddings=True
-    ).astype(np.float32)  # (1, D)
+def _fingerprint(d: Dict[str, Any]) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    h.update(d["title"].encode("utf-8"))
+    h.update(b"\x00")
+    h.update(d["content"].encode("utf-8"))
+    return h.hexdigest()
+
+def _top(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # top-k bez sortiranja cijelog niza (argpartition), zatim sort samo k elemenata
+    if k <= 0:
+        return rows[:0], scores[:0]
+    if rows.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[part], scores[part]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+class IndexGeneration:
+    """Jedna generacija semantičkog + BM25 indeksa za određeni model i verziju pipelinea.
+
+    Pretraga čita aktivnu generaciju preko jedne reference, pa se nova generacija
+    gradi u pozadini i zamjenjuje atomarno (vidi _swap).
+    """
+
+    def __init__(self, model_name: Optional[str] = None, version: Optional[str] = None,
+                 chunk_words: Optional[int] = None, chunk_overlap: Optional[int] = None):
+        self.model_name = model_name or EMB_MODEL_NAME
+        self.version = str(version or EMB_INDEX_VERSION)
+        self.chunk_words = EMB_CHUNK_WORDS if chunk_words is None else chunk_words
+        self.chunk_overlap = EMB_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        self.created_at = time.time()
+        self.lock = threading.Lock()
+        self.documents: List[Dict[str, Any]] = []
+        self.fingerprints: List[str] = []
+        self.row_of: Dict[int, int] = {}
+        # jedan redak po chunku; chunkovi istog posta su uzastopni
+        self.embeddings: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        # chunk -> post mapiranje kao offseti (CSR): početak i broj chunkova po postu
+        self.doc_start: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.doc_nchunks: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.lexical = BM25Index()
+
+    @property
+    def tag(self) -> str:
+        return f"{self.model_name}@v{self.version}"
+
+    def same_pipeline(self, other: "IndexGeneration") -> bool:
+        return (self.model_name, self.version, self.chunk_words, self.chunk_overlap) == \
+            (other.model_name, other.version, other.chunk_words, other.chunk_overlap)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "tag": self.tag,
+            "model": self.model_name,
+            "version": self.version,
+            "chunk_words": self.chunk_words,
+            "created_at": self.created_at,
+            "docs": len(self.documents),
+            "chunks": int(self.embeddings.shape[0]),
+            "bytes": self.nbytes(),
+        }
+
+    def nbytes(self) -> int:
+        return int(self.embeddings.nbytes + self.doc_start.nbytes + self.doc_nchunks.nbytes)
+
+    def vectors_for(self, d: Dict[str, Any], fp: str) -> Optional[np.ndarray]:
+        """Postojeći chunk vektori posta ako se tekst nije promijenio (za ponovnu upotrebu)."""
+        with self.lock:
+            row = self.row_of.get(d["id"])
+            if row is None or self.fingerprints[row] != fp:
+                return None
+            start = int(self.doc_start[row])
+            return self.embeddings[start:start + int(self.doc_nchunks[row])]
+
+    def embed(self, docs: List[Dict[str, Any]], reuse: Optional["IndexGeneration"] = None,
+              stats: Optional[Dict[str, Any]] = None) -> List[np.ndarray]:
+        """Chunk vektori po postu; nepromijenjeni postovi se preuzimaju iz reuse generacije.
+
+        Uz stats se broj preuzetih postova dodaje u stats["reused"].
+        """
+        out: List[Optional[np.ndarray]] = [None] * len(docs)
+        texts: List[str] = []
+        owners: List[Tuple[int, int]] = []
+        if reuse is not None and not reuse.same_pipeline(self):
+            reuse = None
+        for i, d in enumerate(docs):
+            if reuse is not None:
+                vecs = reuse.vectors_for(d, _fingerprint(d))
+                if vecs is not None:
+                    out[i] = vecs
+                    if stats is not None:
+                        stats["reused"] = stats.get("reused", 0) + 1
+                    continue
+            chunks = chunk_text(d["title"], d["content"], self.chunk_words, self.chunk_overlap)
+            texts.extend(chunks)
+            owners.append((i, len(chunks)))
+        if texts:
+            batch = max(1, EMB_BATCH_SIZE)
+            parts = [_encode(texts[j:j + batch], "document", self.model_name) for j in range(0, len(texts), batch)]
+            emb = parts[0] if len(parts) == 1 else np.vstack(parts)  # (C, D)
+            pos = 0
+            for i, n in owners:
+                out[i] = emb[pos:pos + n]
+                pos += n
+        return out
+
+    def append(self, docs: List[Dict[str, Any]], vectors: List[np.ndarray]) -> int:
+        """Dodaje postove s gotovim vektorima; postovi koji su već u generaciji se preskaču."""
+        with self.lock:
+            fresh = [(d, v) for d, v in zip(docs, vectors) if d["id"] not in self.row_of]
+            if not fresh:
+                return 0
+            counts = np.asarray([v.shape[0] for _, v in fresh], dtype=np.int32)
+            starts = self.embeddings.shape[0] + np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+            new = np.concatenate([v for _, v in fresh])
+            self.embeddings = new if self.embeddings.size == 0 else np.vstack([self.embeddings, new])
+            self.doc_start = np.concatenate([self.doc_start, starts])
+            self.doc_nchunks = np.concatenate([self.doc_nchunks, counts])
+            for d, _ in fresh:
+                self.row_of[d["id"]] = len(self.documents)
+                self.documents.append({
+                    "id": d["id"],
+                    "title": d["title"],
+                    "content": d["content"],
+                    "category": d["category"]
+                })
+                self.fingerprints.append(_fingerprint(d))
+                self.lexical.add(f"{d['title']} {d['content']}")
+            return len(fresh)
+
+    def _doc_scores(self, qv: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sličnost upita po postu = maksimum po njegovim chunkovima (max-pool).
+
+        Chunkovi posta su uzastopni, pa je group-by jedan np.maximum.reduceat nad
+        početnim indeksima segmenata. rows=None boduje sve postove.
+        """
+        q = qv.reshape(-1)
+        if rows is None:
+            chunk_scores = self.embeddings @ q
+            if chunk_scores.shape[0] == len(self.documents):
+                return chunk_scores
+            return np.maximum.reduceat(chunk_scores, self.doc_start)
+        counts = self.doc_nchunks[rows]
+        seg = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        # indeksi chunkova odabranih postova: start posta + pomak unutar segmenta
+        idx = np.repeat(self.doc_start[rows] - seg, counts) + np.arange(int(counts.sum()))
+        return np.maximum.reduceat(self.embeddings[idx] @ q, seg)
 
-    with _index_lock:
-        scores = np.dot(_embeddings, qv.T).flatten()
+    def _hit(self, idx: int, score: float, **extra) -> Dict[str, Any]:
+        d = self.documents[idx]
+        return {
+            "id": d["id"],
+            "title": d["title"],
+            "content": d["content"],
+            "category": d["category"],
+            "score": score,
+            **extra,
+        }
+
+    def search_vector(self, qv: np.ndarray, top_k: int):
+        scores = self._doc_scores(qv)
         top_idx = np.argsort(-scores)[:top_k]
 
         results = []
         for idx in top_idx:
-            if idx < len(_documents):
+            if idx < len(self.documents):
                 score = float(scores[idx])
                 if score >= EMB_MIN_SCORE:
-                    d = _documents[idx]
-                    results.append({
-                        "id": d["id"],
-                        "title": d["title"],
-                        "content": d["content"],
-                        "category": d["category"],
-                        "score": score
-                    })
+                    results.append(self._hit(idx, score))
+        return results
+
+    def search_lexical(self, terms: List[str], top_k: int):
+        rows, scores = self.lexical.search(terms)
+        rows, scores = _top(rows, scores, top_k)
+        return [self._hit(int(r), float(s), bm25_score=float(s)) for r, s in zip(rows, scores)]
+
+    def search_hybrid(self, terms: List[str], qv: np.ndarray, top_k: int):
+        """Reciprocal rank fusion leksičkih (BM25) i vektorskih kandidata.
+
+        Leksički pogoci ne podliježu EMB_MIN_SCORE (točna ključna riječ ostaje u
+        rezultatima), a čisto vektorski kandidati da. Kad je upit selektivan,
+        vektorski se boduju samo leksički kandidati.
+        """
+        n = len(self.documents)
+        n_cand = max(top_k, HYBRID_CANDIDATES)
+        lex_rows, lex_scores = self.lexical.search(terms)
+        pruned = 0 < lex_rows.size <= HYBRID_PRUNE_RATIO * n
+        lex_rows, lex_scores = _top(lex_rows, lex_scores, n_cand)
+
+        if pruned:
+            vec_rows = lex_rows
+            vec_scores = self._doc_scores(qv, vec_rows)
+            vec = dict(zip(vec_rows.tolist(), vec_scores.tolist()))
+        else:
+            all_scores = self._doc_scores(qv)
+            keep = all_scores >= EMB_MIN_SCORE
+            keep[lex_rows] = True
+            vec_rows = np.flatnonzero(keep)
+            vec_scores = all_scores[vec_rows]
+            vec = {int(r): float(all_scores[r]) for r in lex_rows}
+        vec_rows, vec_scores = _top(vec_rows, vec_scores, n_cand)
+        vec.update(zip(vec_rows.tolist(), vec_scores.tolist()))
+
+        fused: Dict[int, float] = {}
+        for rows in (lex_rows, vec_rows):
+            for rank, r in enumerate(rows.tolist()):
+                fused[r] = fused.get(r, 0.0) + 1.0 / (RRF_K + rank + 1)
+        bm25 = dict(zip(lex_rows.tolist(), lex_scores.tolist()))
+
+        best = sorted(fused.items(), key=lambda kv: -kv[1])[:top_k]
+        return [
+            self._hit(r, s, bm25_score=bm25.get(r, 0.0), vector_score=vec.get(r), pruned=pruned)
+            for r, s in best
+        ]
+
+
+# Aktivna generacija (servira pretragu) i prethodna (za rollback).
+# Pisanja i zamjene generacija idu pod _write_lock; čitanja samo uzmu referencu.
+_active = IndexGeneration()
+_previous: Optional[IndexGeneration] = None
+_write_lock = threading.RLock()
+
+_build_thread: Optional[threading.Thread] = None
+_build_status: Dict[str, Any] = {"state": "idle"}
+
+def active_generation() -> IndexGeneration:
+    return _active
+
+def index_size() -> int:
+    return len(_active.documents)
+
+def index_chunks() -> int:
+    return int(_active.embeddings.shape[0])
+
+def index_nbytes() -> int:
+    return _active.nbytes()
+
+def _build_progress() -> float:
+    st = _build_status
+    return st.get("done", 0) / st["total"] if st.get("total") else 0.0
+
+metrics.register_gauge("embedding_index_rows", "Broj dokumenata u semantičkom indeksu.", index_size)
+metrics.register_gauge("embedding_index_chunks", "Broj chunk vektora u semantičkom indeksu.", index_chunks)
+metrics.register_gauge("embedding_index_bytes", "Memorija vektora i chunk mapiranja (bajtovi).", index_nbytes)
+metrics.register_gauge("embedding_reindex_progress", "Napredak izgradnje nove generacije (0-1).", _build_progress)
+
+def clear_index():
+    global _active
+    with _write_lock:
+        _active = IndexGeneration()
+
+def add_docs_to_index(docs: List[Dict[str, Any]]) -> int:
+    """Dodaje više postova odjednom (dict s id, title, content, category) u aktivnu generaciju.
+
+    Chunkovi svih postova se enkodiraju u batchevima od EMB_BATCH_SIZE, a
+    matrica se proširuje jednom po pozivu umjesto jednom po postu.
+    """
+    if not docs:
+        return 0
+    with _write_lock:
+        gen = _active
+        return gen.append(docs, gen.embed(docs))
+
+def add_doc_to_index(doc_id: int, title: str, content: str, category: str):
+    add_docs_to_index([{"id": doc_id, "title": title, "content": content, "category": category}])
+
+def _swap(gen: IndexGeneration, rotate: bool = True):
+    """Postavlja gen kao aktivnu; uz rotate dosadašnja aktivna postaje prethodna (za rollback)."""
+    global _active, _previous
+    with _write_lock:
+        if gen is _active:
+            return
+        if rotate:
+            _previous = _active
+        _active = gen
+
+def _refresh_of(gen: IndexGeneration) -> IndexGeneration:
+    """Prazna generacija istog pipelinea i identiteta kao gen (osvježavanje na mjestu)."""
+    target = IndexGeneration(gen.model_name, gen.version, gen.chunk_words, gen.chunk_overlap)
+    target.created_at = gen.created_at
+    return target
+
+def _build_generation(loader: Callable[[], List[Dict[str, Any]]], target: IndexGeneration,
+                      reuse: Optional[IndexGeneration], batch_docs: int = 0,
+                      max_batches_per_sec: float = 0.0, status: Optional[Dict[str, Any]] = None,
+                      expect: Optional[IndexGeneration] = None, rotate: bool = True,
+                      check: Optional[Callable[[], None]] = None) -> IndexGeneration:
+    """Gradi target generaciju iz loader() i atomarno je postavlja kao aktivnu.
+
+    Glavni prolaz ide bez locka (pretraga i dalje koristi staru generaciju), po
+    potrebi u throttlanim batchevima. Na kraju se pod _write_lock ponovno učita
+    popis postova i enkodiraju samo promjene nastale u međuvremenu, pa se zamijeni.
+
+    Uz expect se target gradi kao osvježenje te generacije: ako je pod lockom
+    aktivna već neka druga (npr. reindeks je u međuvremenu zamijenio model),
+    osvježava se nova aktivna umjesto da se stara vrati. check() se poziva pod
+    lockom prije zamjene i može prekinuti izgradnju iznimkom.
+    """
+    status = status if status is not None else {}
+    docs = loader()
+    status.update(total=len(docs), done=0, reused=0)
+    vectors: Dict[int, Tuple[str, np.ndarray]] = {}
+    step = batch_docs if batch_docs > 0 else max(1, len(docs))
+    min_interval = 1.0 / max_batches_per_sec if max_batches_per_sec > 0 else 0.0
+    for i in range(0, len(docs), step):
+        t0 = time.perf_counter()
+        batch = docs[i:i + step]
+        for d, v in zip(batch, target.embed(batch, reuse, stats=status)):
+            vectors[d["id"]] = (_fingerprint(d), v)
+        status["done"] = min(len(docs), i + step)
+        if min_interval:
+            time.sleep(max(0.0, min_interval - (time.perf_counter() - t0)))
+
+    with _write_lock:
+        if check is not None:
+            check()
+        status["state"] = "swapping"
+        if expect is not None and _active is not expect:
+            if not _active.same_pipeline(target):
+                vectors = {}
+                status["reused"] = 0
+            target = _refresh_of(_active)
+        docs = loader()
+        delta = [d for d in docs if vectors.get(d["id"], ("",))[0] != _fingerprint(d)]
+        for d, v in zip(delta, target.embed(delta, _active, stats=status)):
+            vectors[d["id"]] = (_fingerprint(d), v)
+        target.append(docs, [vectors[d["id"]][1] for d in docs])
+        _swap(target, rotate=rotate)
+    return target
+
+def rebuild_index(loader: Callable[[], List[Dict[str, Any]]]) -> int:
+    """Sinkroni rebuild aktivne generacije (npr. nakon izmjene/brisanja posta).
+
+    Nepromijenjeni postovi preuzimaju postojeće vektore, a pretraga do zamjene
+    koristi staru generaciju umjesto praznog indeksa. Aktivna generacija se
+    zamjenjuje na mjestu (isti tag), a prethodna ostaje sačuvana za rollback.
+    """
+    cur = _active
+    gen = _build_generation(loader, _refresh_of(cur), reuse=cur, expect=cur, rotate=False)
+    return len(gen.documents)
+
+def start_reindex(loader: Callable[[], List[Dict[str, Any]]], model_name: Optional[str] = None,
+                  version: Optional[str] = None, batch_docs: Optional[int] = None,
+                  max_batches_per_sec: Optional[float] = None) -> Dict[str, Any]:
+    """Pokreće izgradnju nove generacije u pozadinskom threadu; stara servira do zamjene."""
+    global _build_thread, _build_status
+    with _write_lock:
+        if _build_thread is not None and _build_thread.is_alive():
+            raise RuntimeError("Reindeksiranje je već u tijeku.")
+        target = IndexGeneration(model_name or EMB_MODEL_NAME, version or EMB_INDEX_VERSION)
+        batch_docs = EMB_REINDEX_BATCH_DOCS if batch_docs is None else batch_docs
+        rate = EMB_REINDEX_MAX_BATCHES_PER_SEC if max_batches_per_sec is None else max_batches_per_sec
+        status = {
+            "state": "building",
+            "target": target.tag,
+            "batch_docs": batch_docs,
+            "max_batches_per_sec": rate,
+            "started_at": time.time(),
+            "total": 0,
+            "done": 0,
+        }
+        _build_status = status
+
+        def run():
+            try:
+                _build_generation(loader, target, reuse=_active, batch_docs=batch_docs,
+                                  max_batches_per_sec=rate, status=status)
+                status["state"] = "done"
+            except Exception as e:
+                status["state"] = "failed"
+                status["error"] = str(e)
+            finally:
+                status["finished_at"] = time.time()
+
+        _build_thread = threading.Thread(target=run, name="postify-reindex", daemon=True)
+        _build_thread.start()
+        return dict(status)
+
+def rollback_index(loader: Optional[Callable[[], List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """Vraća prethodnu generaciju kao aktivnu (trenutna postaje prethodna).
+
+    Uz loader se prethodna generacija najprije dopuni postovima nastalim nakon
+    što je zamijenjena (enkodiraju se samo promjene).
+    """
+    with _write_lock:
+        prev = _previous
+        if prev is None:
+            raise RuntimeError("Nema prethodne generacije.")
+        if loader is None:
+            _swap(prev)
+            return _active.info()
+
+    def check():
+        # reindeks ili drugi rollback je u međuvremenu rotirao generacije
+        if _previous is not prev:
+            raise RuntimeError("Generacije su se promijenile tijekom rollbacka, pokušaj ponovno.")
+
+    # kao i rebuild: glavni prolaz bez locka, pa pisanja i pretraga ne čekaju rollback
+    return _build_generation(loader, _refresh_of(prev), reuse=prev, check=check).info()
+
+def index_status() -> Dict[str, Any]:
+    return {
+        "active": _active.info(),
+        "previous": _previous.info() if _previous is not None else None,
+        "build": dict(_build_status),
+    }
+
+def search_index(query: str, top_k: int = 5, mode: str = "vector"):
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Nepoznat način pretrage: {mode}")
+    gen = _active
+    if len(gen.documents) == 0:
+        return []
+
+    q_norm = _norm(query)
+    terms = tokenize(q_norm)
+    qv = _encode_query(q_norm, gen.model_name) if mode != "lexical" else None  # (1, D)
+
+    with gen.lock:
+        t0 = time.perf_counter()
+        if mode == "vector":
+            results = gen.search_vector(qv, top_k)
+        elif mode == "lexical":
+            results = gen.search_lexical(terms, top_k)
+        else:
+            results = gen.search_hybrid(terms, qv, top_k)
+        metrics.SEARCH_SCORING_LATENCY.observe(time.perf_counter() - t0, mode=mode)
         return results
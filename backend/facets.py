@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import Post, CategoryFacet, MonthFacet
+
+# Inkrementalno održavani agregati za /facets. Funkcije se pozivaju prije
+# db.commit() u create/update/delete, pa su agregati uvijek u istoj transakciji
+# kao i izmjena posta; čitanje je samo nad malim tablicama (kategorije, mjeseci).
+
+
+def _month(dt: Optional[datetime]) -> Optional[str]:
+    return dt.strftime("%Y-%m") if dt else None
+
+
+def _bump_category(db: Session, category: str, delta: int, created_at: Optional[datetime]):
+    stmt = insert(CategoryFacet).values(category=category, post_count=delta, latest_created_at=created_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CategoryFacet.category],
+        set_={
+            "post_count": CategoryFacet.post_count + delta,
+            "latest_created_at": func.max(
+                func.coalesce(CategoryFacet.latest_created_at, stmt.excluded.latest_created_at),
+                func.coalesce(stmt.excluded.latest_created_at, CategoryFacet.latest_created_at),
+            ),
+        },
+    )
+    db.execute(stmt)
+
+
+def _bump_month(db: Session, month: Optional[str], delta: int):
+    if month is None:
+        return
+    stmt = insert(MonthFacet).values(month=month, post_count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MonthFacet.month],
+        set_={"post_count": MonthFacet.post_count + delta},
+    )
+    db.execute(stmt)
+
+
+def _drop_from_category(db: Session, category: str, created_at: Optional[datetime], exclude_id: int):
+    db.query(CategoryFacet).filter(CategoryFacet.category == category).update(
+        {CategoryFacet.post_count: CategoryFacet.post_count - 1}, synchronize_session=False
+    )
+    row = db.query(CategoryFacet).populate_existing().filter(CategoryFacet.category == category).first()
+    if row is None:
+        return
+    if row.post_count <= 0:
+        db.delete(row)
+    elif created_at is not None and row.latest_created_at is not None and created_at >= row.latest_created_at:
+        # uklonjen je najnoviji post kategorije: jedan lookup po indeksu (category, created_at)
+        latest = (
+            db.query(Post.created_at)
+            .filter(Post.category == category, Post.id != exclude_id)
+            .order_by(Post.created_at.desc())
+            .limit(1)
+            .scalar()
+        )
+        row.latest_created_at = latest
+
+
+def on_post_created(db: Session, post: Post):
+    # post mora biti flushan da bi created_at (server_default) bio poznat
+    _bump_category(db, post.category, 1, post.created_at)
+    _bump_month(db, _month(post.created_at), 1)
+
+
+def on_post_updated(db: Session, post: Post, old_category: str):
+    if old_category == post.category:
+        return
+    _drop_from_category(db, old_category, post.created_at, post.id)
+    _bump_category(db, post.category, 1, post.created_at)
+
+
+def on_post_deleted(db: Session, post: Post):
+    _drop_from_category(db, post.category, post.created_at, post.id)
+    month = _month(post.created_at)
+    if month is None:
+        return
+    db.query(MonthFacet).filter(MonthFacet.month == month).update(
+        {MonthFacet.post_count: MonthFacet.post_count - 1}, synchronize_session=False
+    )
+    db.query(MonthFacet).filter(MonthFacet.month == month, MonthFacet.post_count <= 0).delete(
+        synchronize_session=False
+    )
+
+
+def rebuild_facets(db: Session) -> int:
+    """Puni agregate iz posts tablice (jednokratno, npr. za postojeću bazu)."""
+    db.query(CategoryFacet).delete(synchronize_session=False)
+    db.query(MonthFacet).delete(synchronize_session=False)
+    for category, n, latest in (
+        db.query(Post.category, func.count(Post.id), func.max(Post.created_at)).group_by(Post.category)
+    ):
+        db.add(CategoryFacet(category=category, post_count=n, latest_created_at=latest))
+    month = func.strftime("%Y-%m", Post.created_at)
+    for m, n in db.query(month, func.count(Post.id)).filter(Post.created_at.isnot(None)).group_by(month):
+        db.add(MonthFacet(month=m, post_count=n))
+    db.commit()
+    return db.query(CategoryFacet).count()
+
+
+def ensure_facets(db: Session) -> bool:
+    """Gradi agregate ako su prazni, a postova ima; vraća True ako je rebuild napravljen."""
+    if db.query(CategoryFacet.category).first() is not None:
+        return False
+    if db.query(Post.id).first() is None:
+        return False
+    rebuild_facets(db)
+    return True
+
+
+def total_posts(db: Session) -> int:
+    """Ukupan broj postova iz agregata (zbroj po kategorijama, bez count(*) nad posts)."""
+    return db.query(func.coalesce(func.sum(CategoryFacet.post_count), 0)).scalar()
+
+
+def get_facets(db: Session) -> Dict[str, Any]:
+    categories = db.query(CategoryFacet).order_by(CategoryFacet.category).all()
+    months = db.query(MonthFacet).order_by(MonthFacet.month.desc()).all()
+    latest = [c.latest_created_at for c in categories if c.latest_created_at is not None]
+    return {
+        "total": sum(c.post_count for c in categories),
+        "latest_created_at": max(latest) if latest else None,
+        "categories": [
+            {"category": c.category, "count": c.post_count, "latest_created_at": c.latest_created_at}
+            for c in categories
+        ],
+        "months": [{"month": m.month, "count": m.post_count} for m in months],
+    }
@@ -5,15 +5,21 @@ from typing import List, Optional
 
 from fastapi import (
     FastAPI, HTTPException, Depends,
-    UploadFile, File, BackgroundTasks, Form
+    UploadFile, File, BackgroundTasks, Form,
+    Query, Response
 )
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 
-from backend.database import SessionLocal, init_db
+from backend import facets, metrics, profiling, snapshot
+from backend.database import SessionLocal, engine, init_db
 from backend.models import Post, User
-from backend.schemas import PostRead
-from backend.embeddings import add_doc_to_index, search_index, clear_index
+from backend.schemas import PostRead, FacetsRead
+from backend.embeddings import (
+    add_doc_to_index, search_index, rebuild_index,
+    start_reindex, rollback_index, index_status,
+)
 from backend.auth import router as auth_router, get_current_user, hash_password
 
 # inicijalizacija baze (kreira tablice ako ne postoje)
@@ -21,8 +27,19 @@ init_db()
 
 app = FastAPI(title="Blogger API")
 
+# profiliranje pojedinačnog zahtjeva za admina (X-Profile: 1 ili ?profile=1)
+app.router.route_class = profiling.ProfiledRoute
+profiling.instrument_engine(engine)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# metrike: latencija po ruti, in-flight, SQL upiti po zahtjevu (vidi /metrics).
+# Dodaje se zadnji pa je vanjski middleware: broji i 403 i auth upit profiliranja.
+metrics.instrument_engine(engine)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Uključi auth rute
 app.include_router(auth_router)
+app.include_router(profiling.router)
 
 # direktorij za uploadane slike i statički servis
 uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
@@ -56,23 +73,34 @@ def seed_admin():
         db.close()
 
 
-# kompletni rebuild semantičkog indeksa (sam otvara/zatvara DB sesiju)
-def rebuild_whole_index() -> int:
+# svi postovi za indeksiranje (sam otvara/zatvara DB sesiju)
+def load_index_docs() -> List[dict]:
     db = SessionLocal()
     try:
-        posts = db.query(Post).all()
-        clear_index()
-        for p in posts:
-            add_doc_to_index(p.id, p.title, p.content, p.category)
-        return len(posts)
+        return [
+            {"id": p.id, "title": p.title, "content": p.content, "category": p.category}
+            for p in db.query(Post).order_by(Post.id).all()
+        ]
     finally:
         db.close()
 
 
+# kompletni rebuild semantičkog indeksa: nova generacija se gradi uz staru i
+# atomarno zamjenjuje; nepromijenjeni postovi zadržavaju postojeće vektore
+def rebuild_whole_index() -> int:
+    return rebuild_index(load_index_docs)
+
+
 # pri pokretanju procesa
 @app.on_event("startup")
 def _on_startup():
     seed_admin()
+    db = SessionLocal()
+    try:
+        if facets.ensure_facets(db):
+            print("[startup] Izgrađeni facet agregati.")
+    finally:
+        db.close()
     n = rebuild_whole_index()
     print(f"[startup] Reindeksirano {n} postova.")
 
@@ -108,10 +136,13 @@ async def create_post(
         image_filename=image_filename
     )
     db.add(post)
+    db.flush()
+    facets.on_post_created(db, post)
     db.commit()
     db.refresh(post)
 
     background_tasks.add_task(add_doc_to_index, post.id, post.title, post.content, post.category)
+    background_tasks.add_task(snapshot.export_after_write, snapshot.post_change(post))
 
     return PostRead(
         id=post.id,
@@ -123,10 +154,21 @@ async def create_post(
     )
 
 
-# READ: svi postovi (otvoreno)
+# READ: svi postovi (otvoreno); skip/limit za stranice, ukupno u X-Total-Count (iz facet agregata)
 @app.get("/posts/", response_model=List[PostRead])
-def list_posts(db: Session = Depends(get_db)):
-    posts = db.query(Post).order_by(Post.created_at.desc()).all()
+def list_posts(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    q = db.query(Post).order_by(Post.created_at.desc(), Post.id.desc())
+    if limit is not None:
+        response.headers["X-Total-Count"] = str(facets.total_posts(db))
+        q = q.offset(skip).limit(limit)
+    elif skip:
+        q = q.offset(skip)
+    posts = q.all()
     return [
         PostRead(
             id=p.id,
@@ -155,15 +197,18 @@ def update_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post ne postoji")
 
+    old_category = post.category
     post.title = title.strip()
     post.content = content.strip()
     post.category = category.strip()
 
+    facets.on_post_updated(db, post, old_category)
     db.commit()
     db.refresh(post)
 
     if background_tasks is not None:
         background_tasks.add_task(rebuild_whole_index)
+        background_tasks.add_task(snapshot.export_after_write, snapshot.post_change(post, old_category))
 
     return PostRead(
         id=post.id,
@@ -195,11 +240,14 @@ def delete_post(
         except Exception:
             pass
 
+    change = snapshot.post_change(post)
+    facets.on_post_deleted(db, post)
     db.delete(post)
     db.commit()
 
     if background_tasks is not None:
         background_tasks.add_task(rebuild_whole_index)
+        background_tasks.add_task(snapshot.export_after_write, change)
 
     return {"detail": "Post obrisan"}
 
@@ -231,11 +279,23 @@ def filter_posts(
     ]
 
 
+# FACETI: broj postova po kategoriji i mjesecu (iz agregata, ne GROUP BY nad posts)
+@app.get("/facets", response_model=FacetsRead)
+def get_facets(db: Session = Depends(get_db)):
+    return facets.get_facets(db)
+
+
 # SEMANTIČKA PRETRAGA
 @app.get("/search/")
-def search(q: str, k: int = 5, db: Session = Depends(get_db)):
+def search(
+    q: str,
+    k: int = 5,
+    mode: str = Query("vector", pattern="^(vector|hybrid|lexical)$"),
+    db: Session = Depends(get_db),
+):
     try:
-        hits = search_index(q, top_k=k)
+        hits = search_index(q, top_k=k, mode=mode)
+        t0 = time.perf_counter()
         enriched = []
         for h in hits:
             p = db.query(Post).filter(Post.id == h["id"]).first()
@@ -249,14 +309,57 @@ def search(q: str, k: int = 5, db: Session = Depends(get_db)):
                     "score": h["score"],
                     "image_url": image_url,
                     "created_at": p.created_at if p else None,
+                    # hibridni/leksički način vraća i pojedinačne bodove
+                    **{f: h[f] for f in ("bm25_score", "vector_score") if f in h},
                 }
             )
+        metrics.SEARCH_ENRICH_LATENCY.observe(time.perf_counter() - t0)
         return enriched
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ADMIN: generacije semantičkog indeksa (ZAŠTIĆENO)
+@app.get("/admin/index")
+def admin_index_status(current_user: User = Depends(get_current_user)):
+    return index_status()
+
+
+@app.post("/admin/index/reindex", status_code=202)
+def admin_reindex(
+    model_name: Optional[str] = Form(None),
+    version: Optional[str] = Form(None),
+    batch_docs: Optional[int] = Form(None, ge=1),
+    max_batches_per_sec: Optional[float] = Form(None, ge=0),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return start_reindex(
+            load_index_docs,
+            model_name=model_name or None,
+            version=version or None,
+            batch_docs=batch_docs,
+            max_batches_per_sec=max_batches_per_sec,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/admin/index/rollback")
+def admin_rollback(current_user: User = Depends(get_current_user)):
+    try:
+        return rollback_index(load_index_docs)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 # health
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+# metrike u Prometheus text formatu
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
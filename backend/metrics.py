@@ -0,0 +1,295 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match, Mount
+
+# Lagani in-process registar metrika u Prometheus text formatu (bez vanjskih ovisnosti).
+# Sve operacije su O(1)/O(log b) pod jednim lockom po metrici, pa može ostati
+# uključeno i pod punim opterećenjem.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+LabelValues = Tuple[str, ...]
+
+
+def _fmt_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *a, **kw):
+        super().__init__(*a, **kw)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_num(v)}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *a, callback: Optional[Callable[[], float]] = None, **kw):
+        super().__init__(*a, **kw)
+        self._values: Dict[LabelValues, float] = {}
+        # callback se izvršava samo pri scrapeu (npr. veličina indeksa)
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            self.set(float(self._callback()))
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_num(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *a, buckets: Sequence[float] = LATENCY_BUCKETS, **kw):
+        super().__init__(*a, **kw)
+        self.buckets = tuple(sorted(buckets))
+        # po labelu: [brojači po bucketu (nekumulativno) + overflow, suma, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                st = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            st[0][i] += 1
+            st[1] += value
+            st[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._values.items())
+        out = self.header()
+        for key, (counts, total, n) in items:
+            acc = 0
+            for le, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                lbl = _fmt_labels(self.label_names, key, f'le="{_fmt_num(le)}"')
+                out.append(f"{self.name}_bucket{lbl} {acc}")
+            lbl = _fmt_labels(self.label_names, key)
+            out.append(f"{self.name}_sum{lbl} {_fmt_num(total)}")
+            out.append(f"{self.name}_count{lbl} {n}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Latencija HTTP zahtjeva po ruti.", ("method", "route")))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Broj HTTP zahtjeva po ruti i statusu.", ("method", "route", "status")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Broj zahtjeva koji se trenutno obrađuju."))
+
+# DB
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "Broj SQL upita po HTTP zahtjevu.", ("route",), buckets=COUNT_BUCKETS))
+DB_QUERIES = REGISTRY.register(Counter(
+    "db_queries_total", "Ukupan broj izvršenih SQL upita."))
+
+# Embeddings / indeks
+ENCODE_BATCH_SIZE = REGISTRY.register(Histogram(
+    "embedding_encode_batch_size", "Broj tekstova po pozivu encodera.", ("kind",), buckets=COUNT_BUCKETS))
+ENCODE_LATENCY = REGISTRY.register(Histogram(
+    "embedding_encode_duration_seconds", "Trajanje poziva encodera.", ("kind",)))
+SEARCH_SCORING_LATENCY = REGISTRY.register(Histogram(
+    "embedding_search_scoring_seconds", "Trajanje bodovanja upita nad indeksom (bez encodea).", ("mode",)))
+SEARCH_ENRICH_LATENCY = REGISTRY.register(Histogram(
+    "search_enrich_duration_seconds", "Trajanje dohvaćanja postova iz baze za rezultate pretrage."))
+
+# Cache
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Pogoci i promašaji cacheova.", ("cache", "result")))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "cache_hit_ratio", "Udio pogodaka po cacheu.", ("cache",)))
+
+
+def register_gauge(name: str, help: str, callback: Callable[[], float]) -> Gauge:
+    """Gauge čija se vrijednost računa tek pri scrapeu (npr. broj redaka indeksa)."""
+    return REGISTRY.register(Gauge(name, help, callback=callback))
+
+
+def cache_result(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _update_cache_ratios():
+    with CACHE_REQUESTS._lock:
+        caches = {k[0] for k in CACHE_REQUESTS._values}
+    for c in caches:
+        hits = CACHE_REQUESTS.value(cache=c, result="hit")
+        total = hits + CACHE_REQUESTS.value(cache=c, result="miss")
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=c)
+
+
+def render_metrics() -> str:
+    _update_cache_ratios()
+    return REGISTRY.render()
+
+
+# Brojanje SQL upita po zahtjevu: middleware postavi brojač u contextvar,
+# a engine event ga inkrementira (contextvars se prenose u threadpool FastAPI-ja).
+_query_counter: contextvars.ContextVar = contextvars.ContextVar("postify_query_counter", default=None)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.inc()
+        c = _query_counter.get()
+        if c is not None:
+            c[0] += 1
+
+
+def _route_label(scope, root_path: str = "") -> str:
+    """Predložak rute za labelu. scope["route"] postoji samo za APIRoute do koje je
+    zahtjev stigao; mountovi (npr. /uploads) i odgovori prije routinga (npr. 403
+    profiliranja) se razrješavaju matchanjem ruta aplikacije. "unmatched" = stvarni 404."""
+    path = getattr(scope.get("route"), "path", None)
+    if path:
+        return path
+    # router mijenja root_path u scopeu (npr. mount ga produži), pa se matcha s izvornim
+    probe = {**scope, "root_path": root_path}
+    partial = None
+    for r in getattr(scope.get("app"), "routes", ()):
+        match, _ = r.matches(probe)
+        if match == Match.FULL:
+            return f"{r.path}/{{path}}" if isinstance(r, Mount) else r.path
+        if match == Match.PARTIAL and partial is None:
+            partial = r.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """Čisti ASGI middleware: latencija se mjeri do zadnjeg bytea odgovora,
+    pa background taskovi (npr. reindeksiranje) ne ulaze u latenciju rute."""
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _query_counter.set(counter)
+        method = scope.get("method", "")
+        root_path = scope.get("root_path", "")
+        status = {"code": 500}
+        t0 = time.perf_counter()
+        done = False
+
+        def _finish():
+            nonlocal done
+            if done:
+                return
+            done = True
+            route = _route_label(scope, root_path)
+            HTTP_LATENCY.observe(time.perf_counter() - t0, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status["code"]))
+            DB_QUERIES_PER_REQUEST.observe(counter[0], route=route)
+            HTTP_IN_FLIGHT.dec()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                _finish()
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _finish()
+            _query_counter.reset(token)
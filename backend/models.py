@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, func
 from .database import Base
 
 # Tablica za postove
@@ -13,6 +13,25 @@ class Post(Base):
     image_filename = Column(String(512), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# najnoviji post po kategoriji (za održavanje facet agregata pri brisanju)
+Index("ix_posts_category_created_at", Post.category, Post.created_at)
+
+# Agregati za /facets, održavaju se u istoj transakciji kao izmjene postova
+class CategoryFacet(Base):
+    __tablename__ = "facet_categories"
+    __table_args__ = {"extend_existing": True}
+
+    category = Column(String(100), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
+    latest_created_at = Column(DateTime(timezone=True), nullable=True)
+
+class MonthFacet(Base):
+    __tablename__ = "facet_months"
+    __table_args__ = {"extend_existing": True}
+
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    post_count = Column(Integer, nullable=False, default=0)
+
 # Tablica za korisnike (admin)
 class User(Base):
     __tablename__ = "users"
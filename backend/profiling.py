@@ -0,0 +1,251 @@
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import itertools
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from .auth import get_current_user, user_from_token
+from .database import SessionLocal
+from .models import User
+
+# Profiliranje pojedinačnog zahtjeva (samo za prijavljenog admina):
+#   header  X-Profile: 1   ili   query  ?profile=1
+# Odgovor dobiva header X-Profile-Id, a izvještaj (cProfile + SQL timeline)
+# se preuzima s GET /admin/profiles/{id}. Neprofilirani zahtjevi plaćaju
+# samo jedan contextvar lookup u endpointu i SQL eventima.
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_FLAGS = (b"profile=1", b"profile=true")
+MAX_STORED_PROFILES = 20
+MAX_STATEMENT_CHARS = 500
+PSTATS_LIMIT = 40
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+_current: contextvars.ContextVar = contextvars.ContextVar("postify_profile", default=None)
+_ids = itertools.count(1)
+_store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_store_lock = threading.Lock()
+
+
+class ProfileSession:
+    def __init__(self, method: str, path: str, user: str):
+        self.id = f"{int(time.time())}-{next(_ids)}"
+        self.method = method
+        self.path = path
+        self.user = user
+        self.t0 = time.perf_counter()
+        self.started_at = time.time()
+        self.sql: List[Dict[str, Any]] = []
+        self.profile_text: Optional[str] = None
+        # zatvoreno nakon slanja headera: SQL iz background taskova se ne bilježi
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add_sql(self, statement: str, start: float, duration: float, executemany: bool):
+        with self._lock:
+            if self.closed:
+                return
+            self.sql.append({
+                "offset_ms": round((start - self.t0) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+                "statement": statement[:MAX_STATEMENT_CHARS],
+                "executemany": executemany,
+                "thread": threading.get_ident(),
+            })
+
+    def report(self, status: int) -> Dict[str, Any]:
+        with self._lock:
+            self.closed = True
+        total = time.perf_counter() - self.t0
+        sql_total = sum(s["duration_ms"] for s in self.sql)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "user": self.user,
+            "status": status,
+            "started_at": self.started_at,
+            "total_ms": round(total * 1000, 3),
+            "sql_count": len(self.sql),
+            "sql_total_ms": round(sql_total, 3),
+            "sql": self.sql,
+            "profile": self.profile_text,
+        }
+
+
+def _stats_text(prof: cProfile.Profile) -> str:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PSTATS_LIMIT)
+    return buf.getvalue()
+
+
+def _profiled(endpoint):
+    """Omotava endpoint: cProfile se uključuje samo ako je zahtjev označen za profiliranje.
+
+    cProfile prati samo trenutni thread, pa se mora uključiti u threadu u kojem
+    FastAPI izvršava endpoint (threadpool za sync, event loop za async endpointe).
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            session = _current.get()
+            if session is None or session.closed:
+                return await endpoint(*args, **kwargs)
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                prof.disable()
+                session.profile_text = _stats_text(prof)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            session = _current.get()
+            if session is None or session.closed:
+                return endpoint(*args, **kwargs)
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                prof.disable()
+                session.profile_text = _stats_text(prof)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute čiji endpoint zna profilirati zahtjev (app.router.route_class)."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("postify_profile_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        session = _current.get()
+        if session is None:
+            return
+        starts = conn.info.get("postify_profile_t0")
+        if not starts:
+            return
+        start = starts.pop()
+        session.add_sql(statement, start, time.perf_counter() - start, executemany)
+
+
+def _store_report(report: Dict[str, Any]):
+    with _store_lock:
+        _store[report["id"]] = report
+        while len(_store) > MAX_STORED_PROFILES:
+            _store.popitem(last=False)
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER:
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    qs = scope.get("query_string", b"")
+    return bool(qs) and any(flag in qs.split(b"&") for flag in PROFILE_QUERY_FLAGS)
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token.strip()
+    return None
+
+
+def _load_user(token: str) -> Optional[User]:
+    db = SessionLocal()
+    try:
+        return user_from_token(db, token)
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+
+async def _authorize(scope) -> Optional[User]:
+    token = _bearer_token(scope)
+    if not token:
+        return None
+    # sinkroni SQLAlchemy upit ne smije blokirati event loop
+    return await run_in_threadpool(_load_user, token)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        user = await _authorize(scope)
+        if user is None:
+            resp = JSONResponse({"detail": "Profiliranje je dostupno samo prijavljenom adminu."}, status_code=403)
+            await resp(scope, receive, send)
+            return
+
+        session = ProfileSession(scope.get("method", ""), scope.get("path", ""), user.username)
+        token = _current.set(session)
+        sent = False
+
+        async def send_wrapper(message):
+            nonlocal sent
+            if message["type"] == "http.response.start" and not sent:
+                # endpoint je gotov prije slanja headera; background taskovi ne ulaze u izvještaj
+                sent = True
+                _store_report(session.report(message["status"]))
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if not sent:
+                _store_report(session.report(500))
+
+
+@router.get("/")
+def list_profiles(current_user: User = Depends(get_current_user)):
+    with _store_lock:
+        reports = list(_store.values())
+    return [
+        {k: r[k] for k in ("id", "method", "path", "status", "total_ms", "sql_count", "sql_total_ms")}
+        for r in reversed(reports)
+    ]
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, current_user: User = Depends(get_current_user)):
+    with _store_lock:
+        report = _store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profil ne postoji")
+    return report
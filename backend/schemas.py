@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # Post sheme
@@ -18,6 +18,22 @@ class PostRead(BaseModel):
     created_at: datetime
     model_config = {"from_attributes": True}
 
+# Facet sheme
+class CategoryFacetRead(BaseModel):
+    category: str
+    count: int
+    latest_created_at: Optional[datetime] = None
+
+class MonthFacetRead(BaseModel):
+    month: str
+    count: int
+
+class FacetsRead(BaseModel):
+    total: int
+    latest_created_at: Optional[datetime] = None
+    categories: List[CategoryFacetRead]
+    months: List[MonthFacetRead]
+
 # Auth sheme
 class UserCreate(BaseModel):
     username: str = Field(min_length=3, max_length=150)
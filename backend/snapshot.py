@@ -0,0 +1,374 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from PIL import Image
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .facets import ensure_facets, get_facets
+from .models import Post
+from .schemas import PostRead, FacetsRead
+
+try:
+    import brotli
+except ImportError:  # opcionalno: bez brotlija se pišu samo .json i .json.gz
+    brotli = None
+
+# Statički snapshot arhive za CDN / statički server:
+#
+#   index.json                      manifest (broj stranica po listi, veličina stranice)
+#   facets.json                     isto što i GET /facets
+#   posts/page-{n}.json             svi postovi
+#   filter/{slug}/page-{n}.json     postovi kategorije (GET /filter/?category=...); slug je u index.json
+#   uploads/{ime} i uploads/thumb/{ime}.jpg
+#
+# Stranice su numerirane od najstarijih postova (page-1 = najstariji), pa nova
+# objava mijenja samo zadnju stranicu liste i svoje kategorije. Nakon izmjene se
+# renderiraju samo liste promijenjenog posta od njegove stranice nadalje (vidi
+# export_snapshot). Svaka datoteka ima i .gz (te .br ako je brotli instaliran)
+# verziju. Hash svake datoteke se pamti u .snapshot-state.json i zapisuju se samo
+# datoteke čiji se sadržaj promijenio.
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_PAGE_SIZE = int(os.getenv("SNAPSHOT_PAGE_SIZE", "50"))
+SNAPSHOT_THUMB_SIDE = int(os.getenv("SNAPSHOT_THUMB_SIDE", "320"))
+UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "uploads")
+STATE_FILE = ".snapshot-state.json"
+# podiže se kad se promijeni raspored ili redoslijed stranica; drugačije stanje = puni izvoz
+# (v2: redoslijed po julianday(created_at), stranice iz v1 mogu biti zastarjele)
+STATE_VERSION = 2
+
+_export_lock = threading.Lock()
+_queue_lock = threading.Lock()
+_queue: List[Optional[Dict[str, Any]]] = []  # post_change() opisi izmjena koje čekaju izvoz
+
+
+def slugify(s: str) -> str:
+    """Slug kategorije za putanju; kratki hash originala čini ga jedinstvenim (C++ i C# nisu isti)."""
+    ascii_s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    base = re.sub(r"[^a-zA-Z0-9]+", "-", ascii_s).strip("-").lower() or "kategorija"
+    return f"{base}-{hashlib.sha1(s.encode('utf-8')).hexdigest()[:8]}"
+
+
+def thumb_name(image_filename: str) -> str:
+    return os.path.splitext(image_filename)[0] + ".jpg"
+
+
+def _post_json(p: Post) -> Dict[str, Any]:
+    data = PostRead(
+        id=p.id,
+        title=p.title,
+        content=p.content,
+        category=p.category,
+        image_url=f"/uploads/{p.image_filename}" if p.image_filename else None,
+        created_at=p.created_at,
+    ).model_dump(mode="json")
+    data["thumb_url"] = f"/uploads/thumb/{thumb_name(p.image_filename)}" if p.image_filename else None
+    return data
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_variants(path: str, data: bytes):
+    _atomic_write(path, data)
+    # mtime=0 da isti sadržaj uvijek daje isti .gz
+    _atomic_write(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _atomic_write(path + ".br", brotli.compress(data))
+
+
+def _remove_variants(path: str):
+    for p in (path, path + ".gz", path + ".br"):
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _load_state(out_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def post_change(post: Post, *old_categories: str) -> Dict[str, Any]:
+    """Opis izmjene posta za inkrementalni izvoz; uzima se prije db.delete()/nakon refresh()."""
+    return {
+        "id": post.id,
+        "created_at": post.created_at,
+        "categories": sorted({post.category, *old_categories}),
+        "image": post.image_filename,
+    }
+
+
+def _list_prefix(category: Optional[str]) -> str:
+    return "posts" if category is None else f"filter/{slugify(category)}"
+
+
+def _page_no(rel: str) -> int:
+    return int(rel.rsplit("page-", 1)[1].split(".", 1)[0])
+
+
+def order_key():
+    """Ključ redoslijeda postova u snapshotu (uz Post.id kao tie-break).
+
+    created_at se uspoređuje normaliziran: server_default zapisuje
+    '2026-10-19 01:40:57', a SQLAlchemy veže datetime kao '... 01:40:57.000000',
+    pa bi tekstualna usporedba istu sekundu vidjela kao "prije".
+    """
+    return func.julianday(Post.created_at)
+
+
+def _first_page(db: Session, change: Dict[str, Any], category: Optional[str], page_size: int) -> int:
+    """Prva stranica liste na koju izmjena utječe: broj postova ispred promijenjenog // page_size."""
+    created_at = change.get("created_at")
+    if created_at is None:
+        return 0
+    ts = func.julianday(created_at)
+    q = db.query(func.count(Post.id)).filter(Post.id != change["id"], or_(
+        order_key() < ts,
+        and_(order_key() == ts, Post.id < change["id"]),
+    ))
+    if category is not None:
+        q = q.filter(Post.category == category)
+    return q.scalar() // page_size
+
+
+def _render_list(db: Session, category: Optional[str], first_page: int, page_size: int) -> Dict[str, bytes]:
+    """Stranice liste od first_page (0-based) do kraja; stranice su uzlazno po vremenu,
+    a unutar stranice najnoviji prvi, kao u API-ju."""
+    q = db.query(Post)
+    if category is not None:
+        q = q.filter(Post.category == category)
+    rows = q.order_by(order_key().asc(), Post.id.asc()).offset(first_page * page_size).all()
+    prefix = _list_prefix(category)
+    files = {}
+    for i in range(0, len(rows), page_size):
+        n = first_page + i // page_size + 1
+        payload: Dict[str, Any] = {"page": n, "items": [_post_json(p) for p in reversed(rows[i:i + page_size])]}
+        if category is not None:
+            payload["category"] = category
+        files[f"{prefix}/page-{n}.json"] = _dumps(payload)
+    return files
+
+
+def _sync_image(out_dir: str, name: str, stats: Dict[str, int]):
+    """Kopija slike i sličica ako izvor postoji, inače briše izvedenice (obrisan post)."""
+    src = os.path.join(UPLOADS_DIR, name)
+    dst = os.path.join(out_dir, "uploads", name)
+    thumb = os.path.join(out_dir, "uploads", "thumb", thumb_name(name))
+    if not os.path.exists(src):
+        for path in (dst, thumb):
+            if os.path.exists(path):
+                os.remove(path)
+                stats["images_removed"] += 1
+        return
+    os.makedirs(os.path.dirname(thumb), exist_ok=True)
+    if not os.path.exists(dst) or os.path.getmtime(dst) < os.path.getmtime(src):
+        shutil.copy2(src, dst)
+        stats["images_written"] += 1
+    if not os.path.exists(thumb) or os.path.getmtime(thumb) < os.path.getmtime(src):
+        with Image.open(src) as img:
+            img.thumbnail((SNAPSHOT_THUMB_SIDE, SNAPSHOT_THUMB_SIDE))
+            tmp = thumb + ".tmp"
+            img.convert("RGB").save(tmp, format="JPEG", quality=80, optimize=True)
+            os.replace(tmp, thumb)
+        stats["images_written"] += 1
+
+
+def _sync_images(out_dir: str, image_filenames: List[str], stats: Dict[str, int]):
+    uploads_out = os.path.join(out_dir, "uploads")
+    thumbs_out = os.path.join(uploads_out, "thumb")
+    os.makedirs(thumbs_out, exist_ok=True)
+    wanted = set(image_filenames)
+    for name in wanted:
+        _sync_image(out_dir, name, stats)
+    # izvedenice obrisanih postova
+    thumbs_wanted = {thumb_name(n) for n in wanted}
+    for name in os.listdir(uploads_out):
+        if os.path.isfile(os.path.join(uploads_out, name)) and name not in wanted:
+            os.remove(os.path.join(uploads_out, name))
+            stats["images_removed"] += 1
+    for name in os.listdir(thumbs_out):
+        if name not in thumbs_wanted:
+            os.remove(os.path.join(thumbs_out, name))
+            stats["images_removed"] += 1
+
+
+def export_snapshot(out_dir: Optional[str] = None, page_size: Optional[int] = None, full: bool = False,
+                    changes: Optional[List[Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """Izvozi snapshot arhive u out_dir; vraća statistiku izvoza.
+
+    Uz changes (vidi post_change) ponovno se renderiraju samo liste tih postova
+    ("svi" i njihove kategorije), i to od prve stranice na koju izmjena utječe do
+    kraja liste; index.json i facets.json se grade iz facet agregata. Bez changes,
+    uz full, bez prethodnog stanja ili s drugim page_size/STATE_VERSION radi se puni izvoz.
+    """
+    out_dir = out_dir or SNAPSHOT_DIR
+    if not out_dir:
+        raise ValueError("SNAPSHOT_DIR nije postavljen.")
+    page_size = page_size or SNAPSHOT_PAGE_SIZE
+    t0 = time.perf_counter()
+
+    state = {} if full else _load_state(out_dir)
+    old: Dict[str, str] = state.get("files", {})
+    incremental = (bool(changes) and None not in changes and state.get("page_size") == page_size
+                   and state.get("version") == STATE_VERSION)
+
+    db = SessionLocal()
+    try:
+        ensure_facets(db)
+        facets = FacetsRead(**get_facets(db)).model_dump(mode="json")
+        # lista (None = svi postovi) -> prva stranica (0-based) koju treba ponovno renderirati
+        lists: Dict[Optional[str], int] = {}
+        if incremental:
+            for change in changes:
+                for category in (None, *change["categories"]):
+                    first = _first_page(db, change, category, page_size)
+                    lists[category] = min(first, lists.get(category, first))
+        else:
+            lists[None] = 0
+            for c in facets["categories"]:
+                lists[c["category"]] = 0
+        files: Dict[str, bytes] = {}
+        fallbacks = 0
+        for category, first in list(lists.items()):
+            if not incremental or first == 0:
+                files.update(_render_list(db, category, first, page_size))
+                continue
+            # renderira se i stranica ispred prve promijenjene kao provjera: ona se ne smije
+            # promijeniti. Ako se promijenila (ili je nema u stanju), pokazivač je kriv pa
+            # se cijela lista renderira ispočetka umjesto da na disku ostanu zastarjele stranice.
+            rendered = _render_list(db, category, first - 1, page_size)
+            guard = f"{_list_prefix(category)}/page-{first}.json"
+            if guard in rendered and old.get(guard) == _digest(rendered[guard]):
+                lists[category] = first - 1
+            else:
+                rendered = _render_list(db, category, 0, page_size)
+                lists[category] = 0
+                fallbacks += 1
+                print(f"[snapshot] {guard} se promijenio ispred izmjene; lista se renderira ispočetka.")
+            files.update(rendered)
+        images = None if incremental else [
+            name for (name,) in db.query(Post.image_filename).filter(Post.image_filename.isnot(None))
+        ]
+    finally:
+        db.close()
+
+    files["facets.json"] = _dumps(facets)
+    # manifest ne sadrži vrijeme izvoza, pa se i on mijenja samo kad se promijeni sadržaj
+    files["index.json"] = _dumps({
+        "page_size": page_size,
+        "order": "page-1 = najstariji postovi; unutar stranice najnoviji prvi",
+        "posts": {"count": facets["total"], "pages": -(-facets["total"] // page_size)},
+        "categories": {
+            c["category"]: {"slug": slugify(c["category"]), "count": c["count"],
+                            "pages": -(-c["count"] // page_size)}
+            for c in facets["categories"]
+        },
+    })
+
+    if incremental:
+        # zastarjele su samo stranice ponovno renderiranih lista iza njihovog novog kraja
+        stale = set()
+        for category, first in lists.items():
+            prefix = _list_prefix(category) + "/page-"
+            stale.update(rel for rel in old if rel.startswith(prefix)
+                         and _page_no(rel) > first and rel not in files)
+    else:
+        stale = set(old) - set(files)
+
+    new_state = dict(old) if incremental else {}
+    stats = {"mode": "incremental" if incremental else "full", "pages_rendered": len(files),
+             "fallbacks": fallbacks, "pages_written": 0, "pages_removed": 0, "images_written": 0, "images_removed": 0}
+    for rel, data in files.items():
+        digest = _digest(data)
+        new_state[rel] = digest
+        path = os.path.join(out_dir, rel)
+        if old.get(rel) != digest or not os.path.exists(path):
+            _write_variants(path, data)
+            stats["pages_written"] += 1
+    for rel in stale:
+        _remove_variants(os.path.join(out_dir, rel))
+        new_state.pop(rel, None)
+        stats["pages_removed"] += 1
+
+    if incremental:
+        for name in {c["image"] for c in changes if c.get("image")}:
+            _sync_image(out_dir, name, stats)
+    else:
+        _sync_images(out_dir, images, stats)
+    _atomic_write(os.path.join(out_dir, STATE_FILE), _dumps({"version": STATE_VERSION, "page_size": page_size, "files": new_state}))
+    stats["duration_s"] = round(time.perf_counter() - t0, 4)
+    return stats
+
+
+def export_after_write(change: Optional[Dict[str, Any]] = None):
+    """Background task nakon create/update/delete; izmjene pristigle tijekom izvoza se spajaju u jedan sljedeći."""
+    if not SNAPSHOT_DIR:
+        return
+    with _queue_lock:
+        _queue.append(change)
+    while True:
+        if not _export_lock.acquire(blocking=False):
+            # izvoz je u tijeku; on će preuzeti i ovu izmjenu iz reda
+            return
+        try:
+            while True:
+                with _queue_lock:
+                    changes = list(_queue)
+                    _queue.clear()
+                if not changes:
+                    break
+                try:
+                    export_snapshot(SNAPSHOT_DIR, changes=changes)
+                except Exception as e:
+                    print(f"[snapshot] Greška pri izvozu: {e}")
+        finally:
+            _export_lock.release()
+        with _queue_lock:
+            if not _queue:
+                return
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m backend.snapshot", description="Statički snapshot arhive")
+    ap.add_argument("--out", default=SNAPSHOT_DIR, help="izlazni direktorij (zadano SNAPSHOT_DIR)")
+    ap.add_argument("--page-size", type=int, default=SNAPSHOT_PAGE_SIZE)
+    ap.add_argument("--full", action="store_true", help="prepiši sve datoteke, ignoriraj prethodno stanje")
+    args = ap.parse_args(argv)
+    if not args.out:
+        ap.error("zadaj --out ili SNAPSHOT_DIR")
+    stats = export_snapshot(args.out, page_size=args.page_size, full=args.full)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+"""Benchmark Postify API-ja.
+
+Primjer:
+    python -m bench --docs 2000 --requests 1000 --concurrency 16 --out bench_output.json
+
+Sve se vrti nad privremenom blog.db bazom i (zadano) determinističkim encoderom,
+pa radi offline i rezultati su usporedivi između commitova (diff JSON-a).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench", description="Postify benchmark")
+    ap.add_argument("--docs", type=int, default=1000, help="broj sintetičkih postova")
+    ap.add_argument("--queries", type=int, default=200, help="broj upita za mikro-benchmark pretrage")
+    ap.add_argument("--requests", type=int, default=500, help="broj HTTP zahtjeva u load testu")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--write-ratio", type=float, default=0.0, help="udio POST /posts/ zahtjeva (0-1)")
+    ap.add_argument("--rebuild-repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--skip-micro", action="store_true")
+    ap.add_argument("--skip-ranking", action="store_true")
+    ap.add_argument("--skip-load", action="store_true")
+    ap.add_argument("--skip-snapshot", action="store_true", help="preskoči provjeru inkrementalnog snapshota")
+    ap.add_argument("--real-model", action="store_true", help="koristi pravi SentenceTransformer model")
+    ap.add_argument("--min-score", type=float, default=None,
+                    help="EMB_MIN_SCORE za pretragu (zadano 0.0 uz stub encoder, inače postavka backenda)")
+    ap.add_argument("--out", default="-", help="putanja JSON izvještaja ('-' = stdout)")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory(prefix="postify-bench-")
+    # mora biti postavljeno prije prvog importa backend paketa
+    os.environ["BLOG_DB"] = os.path.join(tmp.name, "blog.db")
+    # Stub encoder daje niže sličnosti od MiniLM-a: uz zadani prag 0.50 upit vraća ~1.5 od
+    # top_k=5 pogodaka, pa /search/ u load testu gotovo ne mjeri dohvat i obogaćivanje
+    # rezultata. Uz stub je zato prag 0.0 (uvijek top_k); vrijednost se bilježi u meta.
+    if args.min_score is not None:
+        os.environ["EMB_MIN_SCORE"] = str(args.min_score)
+    elif not args.real_model:
+        os.environ.setdefault("EMB_MIN_SCORE", "0.0")
+
+    from bench.corpus import make_posts, make_queries, seed_db
+    from bench.encoder import StubEncoder
+    from backend import embeddings
+
+    if not args.real_model:
+        embeddings.set_model(StubEncoder())
+
+    posts = make_posts(args.docs, seed=args.seed)
+    queries = make_queries(args.queries, seed=args.seed + 1)
+    t0 = time.perf_counter()
+    n = seed_db(posts)
+    seed_s = time.perf_counter() - t0
+
+    report = {
+        "meta": {
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "encoder": "sentence-transformers" if args.real_model else "stub",
+            "emb_min_score": embeddings.EMB_MIN_SCORE,
+            "docs": n,
+            "seed": args.seed,
+            "seed_db_s": round(seed_s, 4),
+        },
+    }
+
+    if not args.skip_micro:
+        from bench.micro import bench_chunking, bench_index
+        report["micro"] = bench_index(posts, queries, rebuild_repeats=args.rebuild_repeats)
+        # dugi postovi (6 odlomaka) da se vidi trošak chunkova
+        report["micro"]["chunking"] = bench_chunking(make_posts(args.docs, seed=args.seed, paragraphs=6), queries)
+
+    if not args.skip_ranking:
+        from bench.ranking import bench_ranking
+        report["ranking"] = bench_ranking(args.docs, seed=args.seed)
+
+    if not args.skip_load:
+        from bench.load import bench_load
+        report["load"] = bench_load(
+            queries,
+            n_requests=args.requests,
+            concurrency=args.concurrency,
+            write_ratio=args.write_ratio,
+            seed=args.seed,
+        )
+
+    # zadnje, jer dodaje i briše postove u bazi
+    if not args.skip_snapshot:
+        from bench.snapshot import bench_snapshot
+        report["snapshot"] = bench_snapshot()
+
+    out = json.dumps(report, indent=2, sort_keys=True, default=str)
+    if args.out == "-":
+        print(out)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+        print(f"[bench] Izvještaj spremljen u {args.out}", file=sys.stderr)
+
+    tmp.cleanup()
+    if not report.get("snapshot", {}).get("consistent", True):
+        print("[bench] Inkrementalni snapshot se razlikuje od punog izvoza (vidi snapshot.steps).", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Tuple
+
+# iste kategorije kao u frontendu
+CATEGORIES = ["Politika", "Zdravlje i ljepota", "Zabava", "Sport", "Tehnologija"]
+
+_VOCAB = {
+    "Politika": "vlada sabor izbori ministar zakon stranka proračun reforma glasanje koalicija".split(),
+    "Zdravlje i ljepota": "prehrana vježba san koža vitamini dijeta trening zdravlje kosa stres".split(),
+    "Zabava": "film koncert album serija glazba festival pjevačica glumac turneja premijera".split(),
+    "Sport": "utakmica gol prvenstvo trener reprezentacija liga igrač pobjeda sezona stadion".split(),
+    "Tehnologija": "umjetna inteligencija mobitel softver procesor aplikacija mreža podaci robot čip".split(),
+}
+_COMMON = "danas novi novo prvi veliki godina grad ljudi vrijeme svijet priča dan".split()
+
+
+def _sentence(rng: random.Random, words: List[str], n: int) -> str:
+    return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+
+def make_posts(n: int, seed: int = 42, paragraphs: int = 3) -> List[Dict[str, Any]]:
+    """Generira n sintetičkih postova; isti seed daje isti korpus."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(n):
+        cat = CATEGORIES[i % len(CATEGORIES)]
+        words = _VOCAB[cat] + _COMMON
+        title = _sentence(rng, words, rng.randint(3, 7)).rstrip(".")
+        content = "\n\n".join(
+            " ".join(_sentence(rng, words, rng.randint(6, 14)) for _ in range(rng.randint(3, 6)))
+            for _ in range(paragraphs)
+        )
+        posts.append({
+            "title": title,
+            "content": content,
+            "category": cat,
+            "created_at": start + timedelta(minutes=37 * i),
+        })
+    return posts
+
+
+def make_category_queries(n: int, seed: int = 7) -> List[Tuple[str, str]]:
+    """Upiti iz vokabulara kategorije: lista (upit, kategorija)."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        cat = rng.choice(CATEGORIES)
+        out.append((" ".join(rng.sample(_VOCAB[cat], rng.randint(1, 3))), cat))
+    return out
+
+
+def make_queries(n: int, seed: int = 7) -> List[str]:
+    return [q for q, _ in make_category_queries(n, seed)]
+
+
+def seed_db(posts: List[Dict[str, Any]]) -> int:
+    """Upisuje postove u bazu na koju pokazuje BLOG_DB (mora biti postavljen prije importa backenda)."""
+    from backend.database import SessionLocal, init_db
+    from backend.models import Post
+
+    init_db()
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Post, posts)
+        db.commit()
+        return db.query(Post).count()
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+import hashlib
+from typing import List
+
+import numpy as np
+
+EMB_DIM = 384
+
+
+class StubEncoder:
+    """Deterministički zamjenski encoder s istim sučeljem kao SentenceTransformer.encode.
+
+    Svaka riječ se hashira u jednu dimenziju (feature hashing), pa tekstovi sa
+    zajedničkim riječima imaju veću kosinusnu sličnost. Radi bez mreže i modela.
+    """
+
+    def __init__(self, dim: int = EMB_DIM):
+        self.dim = dim
+        self.calls = 0
+        self.sentences = 0
+
+    def _token_slot(self, token: str):
+        h = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        v = int.from_bytes(h, "little")
+        return v % self.dim, 1.0 if (v >> 63) & 1 else -1.0
+
+    def encode(self, sentences: List[str], convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True, **kwargs):
+        self.calls += 1
+        self.sentences += len(sentences)
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, s in enumerate(sentences):
+            for tok in s.split():
+                slot, sign = self._token_slot(tok)
+                out[i, slot] += sign
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            out /= norms
+        return out
@@ -0,0 +1,116 @@
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import List, Dict, Any
+
+import httpx
+
+from bench.corpus import CATEGORIES
+from bench.stats import summarize
+
+
+def _admin_token() -> str:
+    from backend.auth import create_access_token
+    from backend.main import seed_admin
+
+    # seed_admin ispisuje na stdout, a stdout je rezerviran za JSON izvještaj
+    with contextlib.redirect_stdout(sys.stderr):
+        seed_admin()
+    return create_access_token(subject=os.getenv("ADMIN_USERNAME", "admin"))
+
+
+def _build_plan(n: int, queries: List[str], write_ratio: float, seed: int):
+    """Deterministički niz zahtjeva (ruta, metoda, url, params/data)."""
+    rng = random.Random(seed)
+    plan = []
+    for i in range(n):
+        r = rng.random()
+        if r < write_ratio:
+            plan.append(("POST /posts/", "POST", "/posts/", {
+                "title": f"Bench post {i}",
+                "content": " ".join(rng.sample(queries, min(3, len(queries)))),
+                "category": rng.choice(CATEGORIES),
+            }))
+            continue
+        r = rng.random()
+        if r < 0.05:
+            plan.append(("GET /facets", "GET", "/facets", None))
+        elif r < 0.35:
+            plan.append(("GET /posts/", "GET", "/posts/", None))
+        elif r < 0.55:
+            plan.append(("GET /filter/?category", "GET", "/filter/", {"category": rng.choice(CATEGORIES)}))
+        elif r < 0.65:
+            plan.append(("GET /filter/?title", "GET", "/filter/", {"title": rng.choice(queries).split()[0]}))
+        else:
+            plan.append(("GET /search/", "GET", "/search/", {"q": rng.choice(queries), "k": 5}))
+    return plan
+
+
+async def _run(app, plan, concurrency: int, token: str):
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def worker():
+            while True:
+                try:
+                    route, method, url, payload = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                if method == "GET":
+                    r = await client.get(url, params=payload)
+                else:
+                    r = await client.post(url, data=payload, headers=headers)
+                dt = time.perf_counter() - t0
+                samples[route].append(dt)
+                samples["ALL"].append(dt)
+                if r.status_code >= 400:
+                    errors[route] += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+    return samples, errors, wall
+
+
+def bench_load(queries: List[str], n_requests: int = 500, concurrency: int = 8,
+               write_ratio: float = 0.0, seed: int = 1) -> Dict[str, Any]:
+    """Pokreće FastAPI aplikaciju u procesu (ASGI transport) pod konkurentnim opterećenjem."""
+    from backend import facets
+    from backend.database import SessionLocal
+    from backend.main import app, rebuild_whole_index
+
+    # ASGITransport ne okida startup evente, pa indeks i agregate gradimo ručno
+    rebuild_whole_index()
+    db = SessionLocal()
+    try:
+        facets.ensure_facets(db)
+    finally:
+        db.close()
+    token = _admin_token() if write_ratio > 0 else ""
+    plan = _build_plan(n_requests, queries, write_ratio, seed)
+    samples, errors, wall = asyncio.run(_run(app, plan, concurrency, token))
+
+    routes = {}
+    for route, s in sorted(samples.items()):
+        if route == "ALL":
+            continue
+        routes[route] = summarize(s, wall)
+        routes[route]["errors"] = errors.get(route, 0)
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "write_ratio": write_ratio,
+        "overall": summarize(samples["ALL"], wall),
+        "routes": routes,
+    }
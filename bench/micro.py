@@ -0,0 +1,92 @@
+import time
+from typing import List, Dict, Any
+
+from bench.stats import summarize, timer
+
+
+def bench_index(posts: List[Dict[str, Any]], queries: List[str], top_k: int = 5,
+                rebuild_repeats: int = 3) -> Dict[str, Any]:
+    """Mikro-benchmarkovi semantičkog indeksa: insert, search i rebuild iz baze (hladni i topli).
+
+    Pretpostavlja da je encoder već podmetnut (set_model) i da je baza napunjena.
+    """
+    from backend import embeddings
+    from backend.main import rebuild_whole_index
+
+    embeddings.clear_index()
+    insert = []
+    t0 = time.perf_counter()
+    for i, p in enumerate(posts, start=1):
+        with timer(insert):
+            embeddings.add_doc_to_index(i, p["title"], p["content"], p["category"])
+    insert_wall = time.perf_counter() - t0
+
+    search = []
+    t0 = time.perf_counter()
+    for q in queries:
+        with timer(search):
+            embeddings.search_index(q, top_k=top_k)
+    search_wall = time.perf_counter() - t0
+
+    # hladni rebuild: svaki put se enkodiraju svi postovi, kao prije generacija indeksa
+    rebuild = []
+    for _ in range(rebuild_repeats):
+        embeddings.clear_index()
+        with timer(rebuild):
+            rebuild_whole_index()
+
+    # topli rebuild (npr. nakon izmjene posta): nepromijenjeni postovi preuzimaju postojeće vektore
+    rebuild_warm = []
+    for _ in range(rebuild_repeats):
+        with timer(rebuild_warm):
+            rebuild_whole_index()
+
+    return {
+        "index_insert": summarize(insert, insert_wall),
+        "index_search": summarize(search, search_wall),
+        "index_rebuild": summarize(rebuild),
+        "index_rebuild_warm": summarize(rebuild_warm),
+    }
+
+
+def bench_chunking(posts: List[Dict[str, Any]], queries: List[str], top_k: int = 5) -> Dict[str, Any]:
+    """Usporedba indeksa s jednim vektorom po postu i indeksa s chunkovima.
+
+    Mjeri memoriju, broj vektora, trajanje izgradnje (batch) i latenciju vektorske pretrage.
+    """
+    from backend import embeddings
+
+    docs = [{"id": i, **p} for i, p in enumerate(posts, start=1)]
+    configured = embeddings.EMB_CHUNK_WORDS
+    out = {}
+    try:
+        for name, chunk_words in (("single", 0), ("chunked", configured or 120)):
+            embeddings.EMB_CHUNK_WORDS = chunk_words
+            embeddings.clear_index()
+            t0 = time.perf_counter()
+            embeddings.add_docs_to_index(docs)
+            build_s = time.perf_counter() - t0
+            for q in queries:  # zagrijavanje cachea upita
+                embeddings.search_index(q, top_k=top_k)
+            search = []
+            t0 = time.perf_counter()
+            for q in queries:
+                with timer(search):
+                    embeddings.search_index(q, top_k=top_k)
+            out[name] = {
+                "chunk_words": chunk_words,
+                "vectors": embeddings.index_chunks(),
+                "index_bytes": embeddings.index_nbytes(),
+                "build_s": round(build_s, 4),
+                "search": summarize(search, time.perf_counter() - t0),
+            }
+    finally:
+        embeddings.EMB_CHUNK_WORDS = configured
+        embeddings.clear_index()
+    s, c = out["single"], out["chunked"]
+    out["overhead"] = {
+        "memory_x": round(c["index_bytes"] / s["index_bytes"], 3) if s["index_bytes"] else None,
+        "search_p50_x": round(c["search"]["p50_ms"] / s["search"]["p50_ms"], 3) if s["search"]["p50_ms"] else None,
+        "build_x": round(c["build_s"] / s["build_s"], 3) if s["build_s"] else None,
+    }
+    return out
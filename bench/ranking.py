@@ -0,0 +1,73 @@
+import random
+import time
+from typing import List, Dict, Any, Set, Tuple
+
+from bench.corpus import CATEGORIES, make_category_queries, make_posts
+from bench.stats import summarize
+
+
+def make_fixture(n: int, n_keyword: int = 50, seed: int = 11) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Set[int], str]]]:
+    """Korpus s označenim upitima: (upit, relevantni id-evi, vrsta).
+
+    - keyword: rijetka ključna riječ ubačena u točno jedan post (npr. šifra proizvoda)
+    - topical: riječi iz vokabulara kategorije, relevantni su svi postovi te kategorije
+    """
+    rng = random.Random(seed)
+    posts = make_posts(n, seed=seed)
+    labelled = []
+    for i in rng.sample(range(n), min(n_keyword, n)):
+        code = f"kod{i:05d}"
+        p = posts[i]
+        # ključna riječ duboko u sadržaju, da je embedding cijelog teksta razrijedi
+        p["content"] = f"{p['content']} Oznaka {code}."
+        labelled.append((code, {i + 1}, "keyword"))
+
+    by_cat: Dict[str, Set[int]] = {c: set() for c in CATEGORIES}
+    for i, p in enumerate(posts, start=1):
+        by_cat[p["category"]].add(i)
+    for q, cat in make_category_queries(n_keyword, seed=seed + 1):
+        labelled.append((q, by_cat[cat], "topical"))
+    return posts, labelled
+
+
+def bench_ranking(n_docs: int = 1000, top_k: int = 5, modes=("vector", "hybrid", "lexical"),
+                  seed: int = 11) -> Dict[str, Any]:
+    """Uspoređuje načine pretrage na fixture korpusu: latencija i kvaliteta (recall@k, MRR, P@k)."""
+    from backend import embeddings
+
+    posts, labelled = make_fixture(n_docs, seed=seed)
+    embeddings.clear_index()
+    for i, p in enumerate(posts, start=1):
+        embeddings.add_doc_to_index(i, p["title"], p["content"], p["category"])
+
+    out = {"docs": n_docs, "top_k": top_k, "queries": len(labelled), "modes": {}}
+    for mode in modes:
+        # zagrijavanje cachea embeddinga upita, da latencija mjeri bodovanje a ne encoder
+        for q, _, _ in labelled:
+            embeddings.search_index(q, top_k=top_k, mode=mode)
+        lat = []
+        quality = {"keyword": {"recall": [], "rr": []}, "topical": {"precision": []}}
+        t0 = time.perf_counter()
+        for q, relevant, kind in labelled:
+            s0 = time.perf_counter()
+            hits = embeddings.search_index(q, top_k=top_k, mode=mode)
+            lat.append(time.perf_counter() - s0)
+            ids = [h["id"] for h in hits]
+            if kind == "keyword":
+                rank = next((r for r, d in enumerate(ids, start=1) if d in relevant), None)
+                quality["keyword"]["recall"].append(1.0 if rank else 0.0)
+                quality["keyword"]["rr"].append(1.0 / rank if rank else 0.0)
+            else:
+                quality["topical"]["precision"].append(sum(d in relevant for d in ids) / top_k)
+        wall = time.perf_counter() - t0
+        out["modes"][mode] = {
+            "latency": summarize(lat, wall),
+            f"keyword_recall@{top_k}": _mean(quality["keyword"]["recall"]),
+            "keyword_mrr": _mean(quality["keyword"]["rr"]),
+            f"topical_precision@{top_k}": _mean(quality["topical"]["precision"]),
+        }
+    return out
+
+
+def _mean(xs: List[float]) -> float:
+    return round(sum(xs) / len(xs), 4) if xs else 0.0
@@ -0,0 +1,123 @@
+import filecmp
+import os
+import tempfile
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from sqlalchemy import text
+
+# kategorija samo za ove scenarije, da su granice njenih stranica pod kontrolom
+CATEGORY = "Snapshot provjera"
+
+
+def _files(root: str) -> List[str]:
+    return sorted(
+        os.path.relpath(os.path.join(d, f), root)
+        for d, _, fs in os.walk(root) for f in fs
+        if not f.startswith(".snapshot-state")
+    )
+
+
+def _diff(a: str, b: str) -> List[str]:
+    fa, fb = _files(a), _files(b)
+    if fa != fb:
+        return sorted(set(fa) ^ set(fb))
+    return [f for f in fa if not filecmp.cmp(os.path.join(a, f), os.path.join(b, f), shallow=False)]
+
+
+def bench_snapshot(page_size: int = 2) -> Dict[str, Any]:
+    """Provjera inkrementalnog snapshota: nakon svake izmjene izlaz mora biti jednak punom izvozu.
+
+    Postovi dobivaju created_at u formatu server_defaulta (CURRENT_TIMESTAMP, sekunde),
+    i to u različitim sekundama i više njih u istoj sekundi, a izmjene padaju na
+    granice stranica (mala page_size). Pretpostavlja napunjenu bazu (BLOG_DB).
+    """
+    from backend import facets
+    from backend import snapshot
+    from backend.database import SessionLocal
+    from backend.models import Post
+
+    def create(ts: str) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            post = Post(title=f"Snapshot {ts}", content="provjera snapshota", category=CATEGORY)
+            db.add(post)
+            db.flush()
+            # isti zapis kao server_default, neovisno o tome koliko je vremena prošlo
+            db.execute(text("UPDATE posts SET created_at = :ts WHERE id = :id"), {"ts": ts, "id": post.id})
+            db.refresh(post)
+            facets.on_post_created(db, post)
+            db.commit()
+            db.refresh(post)
+            return snapshot.post_change(post)
+        finally:
+            db.close()
+
+    def edit(nth: int) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            post = _nth(db, nth)
+            post.title = f"{post.title} (izmijenjeno)"
+            db.commit()
+            db.refresh(post)
+            return snapshot.post_change(post)
+        finally:
+            db.close()
+
+    def delete(nth: int) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            post = _nth(db, nth)
+            change = snapshot.post_change(post)
+            facets.on_post_deleted(db, post)
+            db.delete(post)
+            db.commit()
+            return change
+        finally:
+            db.close()
+
+    def _nth(db, nth: int):
+        # nth-ti post kategorije po redu snapshota (0 = najstariji, -1 = najnoviji)
+        rows = db.query(Post).filter(Post.category == CATEGORY).order_by(
+            snapshot.order_key(), Post.id.asc()).all()
+        return rows[nth]
+
+    base = "2030-01-01 00:00:{:02d}"
+    steps: List[Tuple[str, Callable[[], List[Optional[Dict[str, Any]]]]]] = [
+        ("create distinct seconds", lambda: [create(base.format(0))]),
+        ("create next second", lambda: [create(base.format(1))]),
+        ("create next second (new page)", lambda: [create(base.format(2))]),
+        ("edit last on page", lambda: [edit(1)]),
+        ("delete first", lambda: [delete(0)]),
+        ("create 5 in same second", lambda: [create(base.format(10)) for _ in range(5)]),
+        ("edit oldest", lambda: [edit(0)]),
+        ("edit newest", lambda: [edit(-1)]),
+        ("delete on page boundary", lambda: [delete(1)]),
+        ("create same second as newest", lambda: [create(base.format(10))]),
+        ("delete all", lambda: [delete(0) for _ in range(7)]),
+    ]
+
+    out = {"page_size": page_size, "steps": [], "consistent": True}
+    with tempfile.TemporaryDirectory(prefix="postify-snap-") as tmp:
+        inc = os.path.join(tmp, "inc")
+        snapshot.export_snapshot(inc, page_size=page_size, full=True)
+        for i, (name, step) in enumerate(steps):
+            changes = step()
+            t0 = time.perf_counter()
+            stats = snapshot.export_snapshot(inc, page_size=page_size, changes=changes)
+            inc_s = time.perf_counter() - t0
+            full = os.path.join(tmp, f"full{i}")
+            t0 = time.perf_counter()
+            snapshot.export_snapshot(full, page_size=page_size, full=True)
+            full_s = time.perf_counter() - t0
+            diff = _diff(inc, full)
+            out["consistent"] = out["consistent"] and not diff
+            out["steps"].append({
+                "step": name,
+                "mode": stats["mode"],
+                "pages_rendered": stats["pages_rendered"],
+                "incremental_s": round(inc_s, 4),
+                "full_s": round(full_s, 4),
+                "diff": diff[:10],
+            })
+    return out
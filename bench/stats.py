@@ -0,0 +1,31 @@
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+def summarize(samples_s: List[float], wall_s: float = None) -> Dict[str, Any]:
+    """Latencije (sekunde) -> p50/p95/p99 u ms i propusnost (op/s)."""
+    if not samples_s:
+        return {"n": 0}
+    arr = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    total = wall_s if wall_s is not None else float(np.sum(samples_s))
+    return {
+        "n": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 4),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+        "p99_ms": round(float(np.percentile(arr, 99)), 4),
+        "max_ms": round(float(arr.max()), 4),
+        "throughput_ops": round(arr.size / total, 2) if total > 0 else None,
+    }
+
+
+@contextmanager
+def timer(samples: List[float]):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - t0)
@@ -5,9 +5,14 @@ from datetime import datetime
 import requests
 import streamlit as st
 from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API = os.getenv("API_URL", "http://127.0.0.1:8000")
 DEFAULT_MAX_SIDE = int(os.getenv("MAX_IMAGE_SIDE", "1200"))
+CACHE_TTL = int(os.getenv("FRONTEND_CACHE_TTL", "60"))
+PAGE_SIZE = int(os.getenv("ARCHIVE_PAGE_SIZE", "10"))
+THUMB_SIDE = int(os.getenv("THUMB_SIDE", "240"))
 
 st.set_page_config(page_title="✍️ Postify", layout="wide")
 
@@ -54,10 +59,63 @@ defaults = {
     "token": None,
     "username": None,
     "show_login": False,  # controls bottom login form visibility
+    "archive_page": 0,
 }
 for k, v in defaults.items():
     st.session_state.setdefault(k, v)
 
+# HTTP: jedna pooled sesija po procesu (keep-alive između rerunova)
+@st.cache_resource
+def get_http():
+    s = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, allowed_methods=["GET"], status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+http = get_http()
+
+# Cache čitanja; briše se nakon create/edit/delete (invalidate_cache)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def api_get(path, params=None, timeout=20):
+    """GET na API; vraća (json, X-Total-Count ili None)."""
+    r = http.get(f"{API}{path}", params=params, timeout=timeout)
+    r.raise_for_status()
+    total = r.headers.get("X-Total-Count")
+    return r.json(), int(total) if total is not None else None
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def fetch_thumbnail(image_url, side=THUMB_SIDE):
+    r = http.get(API.rstrip('/') + image_url, timeout=20)
+    r.raise_for_status()
+    img = Image.open(BytesIO(r.content))
+    img.thumbnail((side, side))
+    out = BytesIO()
+    img.convert("RGB").save(out, format="JPEG", quality=80, optimize=True)
+    return out.getvalue()
+
+def show_thumbnail(image_url, width):
+    try:
+        st.image(fetch_thumbnail(image_url), width=width)
+    except Exception:
+        st.image(API.rstrip('/') + image_url, width=width)
+
+def invalidate_cache():
+    api_get.clear()
+
+def score_labels(hit, mode):
+    # u hibridnom načinu score je RRF (zbroj 1/(k+rang), ~0.03), pa se uz njega prikazuju
+    # kosinusna sličnost i BM25 kad ih backend vrati
+    if mode != "hybrid":
+        return [f"sličnost: {hit.get('score', 0):.4f}"]
+    labels = [f"RRF: {hit.get('score', 0):.4f}"]
+    if hit.get("vector_score") is not None:
+        labels.append(f"sličnost: {hit['vector_score']:.4f}")
+    if hit.get("bm25_score"):
+        labels.append(f"BM25: {hit['bm25_score']:.2f}")
+    return labels
+
 # Helpers
 def _resize_image_if_needed(file, max_side):
     """Resize client-side to reduce upload size; return tuple (filename, fileobj, mime)."""
@@ -101,7 +159,20 @@ with st.sidebar:
 
     # Filter
     st.header("🔎 Filtriranje postova")
-    selected_cat = st.selectbox("Kategorija", ["Sve"] + CATEGORIES, key="sb_cat")
+    try:
+        facets, _ = api_get("/facets")
+    except Exception:
+        facets = {"total": None, "categories": [], "months": []}
+    cat_counts = {c["category"]: c["count"] for c in facets["categories"]}
+    # kategorije iz baze (npr. starije) uz one iz forme
+    filter_cats = CATEGORIES + sorted(c for c in cat_counts if c not in CATEGORIES)
+    selected_cat = st.selectbox(
+        "Kategorija", ["Sve"] + filter_cats, key="sb_cat",
+        format_func=lambda c: (
+            f"{c} ({facets['total']})" if c == "Sve" and facets["total"] is not None
+            else f"{c} ({cat_counts.get(c, 0)})" if c != "Sve" else c
+        ),
+    )
     title_filter = st.text_input("Pretraži po naslovu", key="sb_title")
     col_f1, col_f2 = st.columns(2)
     with col_f1:
@@ -119,9 +190,7 @@ with st.sidebar:
         if title_filter:
             params["title"] = title_filter
         try:
-            r = requests.get(f"{API}/filter/", params=params, timeout=20)
-            r.raise_for_status()
-            results = r.json()
+            results, _ = api_get("/filter/", params)
             st.subheader("Rezultati")
             if not results:
                 st.info("Nema postova za zadane filtere.")
@@ -129,35 +198,46 @@ with st.sidebar:
                 for p in results:
                     st.markdown(f"**{p['title']}**  \n_{p['category']}_")
                     if p.get("image_url"):
-                        st.image(API.rstrip('/') + p["image_url"], width=150)
+                        show_thumbnail(p["image_url"], width=150)
                     st.write(p["content"][:200] + ("…" if len(p["content"]) > 200 else ""))
                     st.markdown("---")
         except Exception as e:
             st.error(f"Greška: {e}")
 
+    if facets["months"]:
+        with st.expander("🗓️ Arhiva po mjesecima"):
+            for m in facets["months"]:
+                try:
+                    label = datetime.strptime(m["month"], "%Y-%m").strftime("%m/%Y")
+                except ValueError:
+                    label = m["month"]
+                st.markdown(f"{label} — **{m['count']}**")
+
     st.divider()
 
     st.header("🧠 Semantičko pretraživanje")
     sem_query = st.text_input("Upit", key="semantic_query")
     sem_k = st.slider("Broj rezultata", 1, 10, 5, key="semantic_k")
+    sem_mode = st.radio(
+        "Način", ["hybrid", "vector"], horizontal=True, key="semantic_mode",
+        format_func=lambda m: {"hybrid": "Hibridno", "vector": "Vektorski"}[m],
+    )
     if st.button("Traži semantički", use_container_width=True):
         if not sem_query.strip():
             st.warning("Upiši upit.")
         else:
             with st.spinner("Traži..."):
                 try:
-                    r = requests.get(f"{API}/search/", params={"q": sem_query, "k": sem_k}, timeout=30)
-                    r.raise_for_status()
-                    hits = r.json()
+                    hits, _ = api_get("/search/", {"q": sem_query, "k": sem_k, "mode": sem_mode}, timeout=30)
                     if not hits:
                         st.info("Nema rezultata.")
                     else:
                         for h in hits:
                             st.markdown(f"### {h['title']}")
                             st.write(h["content"])
-                            st.caption(f"Kategorija: {h.get('category','')} • score: {h.get('score',0):.4f}")
+                            st.caption(" • ".join([f"Kategorija: {h.get('category','')}", *score_labels(h, sem_mode)]))
                             if h.get("image_url"):
-                                st.image(API.rstrip('/') + h["image_url"], width=300)
+                                show_thumbnail(h["image_url"], width=300)
                             st.markdown("---")
                 except Exception as e:
                     st.error(f"Greška pri pretraživanju: {e}")
@@ -203,13 +283,13 @@ with st.sidebar:
 
             if submit:
                 try:
-                    r = requests.post(f"{API}/auth/login", data={"username": u, "password": p}, timeout=15)
+                    r = http.post(f"{API}/auth/login", data={"username": u, "password": p}, timeout=15)
                     r.raise_for_status()
                     tok = r.json().get("access_token")
                     if not tok:
                         st.error("Neispravan odgovor poslužitelja.")
                     else:
-                        me = requests.get(f"{API}/auth/me", headers={"Authorization": f"Bearer {tok}"}, timeout=15)
+                        me = http.get(f"{API}/auth/me", headers={"Authorization": f"Bearer {tok}"}, timeout=15)
                         me.raise_for_status()
                         st.session_state.token = tok
                         st.session_state.username = me.json().get("username", u)
@@ -254,8 +334,10 @@ if st.session_state.token:
                     if resized:
                         files["image"] = resized
                 with st.spinner("Objava u tijeku..."):
-                    r = requests.post(f"{API}/posts/", data=data, files=files, headers=auth_headers(), timeout=30)
+                    r = http.post(f"{API}/posts/", data=data, files=files, headers=auth_headers(), timeout=30)
                     r.raise_for_status()
+                invalidate_cache()
+                st.session_state.archive_page = 0
                 st.success("Objavljeno ✅")
                 reset_form()
                 st.rerun()
@@ -280,8 +362,9 @@ if "editing_post" in st.session_state and st.session_state.token:
     if save:
         try:
             data = {"title": new_title, "content": new_content, "category": new_category}
-            r = requests.put(f"{API}/posts/{ep['id']}", data=data, headers=auth_headers(), timeout=20)
+            r = http.put(f"{API}/posts/{ep['id']}", data=data, headers=auth_headers(), timeout=20)
             r.raise_for_status()
+            invalidate_cache()
             st.toast("Post ažuriran ✅")
             del st.session_state["editing_post"]
             st.rerun()
@@ -293,28 +376,57 @@ if "editing_post" in st.session_state and st.session_state.token:
 
 #Arhiva postova
 st.header("📜 Arhiva postova")
+
+def _set_page(page):
+    st.session_state.archive_page = max(0, page)
+
+def _page_nav(page, pages, key):
+    c1, c2, c3 = st.columns([1, 2, 1])
+    with c1:
+        st.button("← Novije", key=f"prev_{key}", disabled=page <= 0,
+                  on_click=_set_page, args=(page - 1,), use_container_width=True)
+    with c2:
+        st.markdown(f"<center>Stranica {page + 1} / {pages}</center>", unsafe_allow_html=True)
+    with c3:
+        st.button("Starije →", key=f"next_{key}", disabled=page >= pages - 1,
+                  on_click=_set_page, args=(page + 1,), use_container_width=True)
+
 try:
-    r = requests.get(f"{API}/posts/", timeout=20)
-    r.raise_for_status()
-    posts = r.json()
+    page = st.session_state.archive_page
+    posts, total = api_get("/posts/", {"skip": page * PAGE_SIZE, "limit": PAGE_SIZE})
+    total = total if total is not None else len(posts)
+    pages = max(1, -(-total // PAGE_SIZE))
+    if page >= pages:
+        # npr. nakon brisanja zadnjeg posta na zadnjoj stranici
+        _set_page(pages - 1)
+        st.rerun()
 
     if not posts:
         st.info("Još nema postova.")
     else:
         for p in posts:
             with st.container(border=True):
-                st.markdown(f"### {p['title']}")
-                st.caption(f"Kategorija: {p['category']}")
-                if p.get("image_url"):
-                    st.image(API.rstrip('/') + p["image_url"], width=420)
-                st.write(p["content"])
-                if p.get("created_at"):
-                    try:
-                        # backend vraća ISO8601; zamjena Z -> +00:00 je fallback
-                        dt = datetime.fromisoformat(p["created_at"].replace("Z", "+00:00"))
-                        st.caption(f"Objavljeno: {dt.strftime('%d.%m.%Y %H:%M:%S')}")
-                    except Exception:
-                        pass
+                col_img, col_txt = st.columns([1, 3]) if p.get("image_url") else (None, st.container())
+                if col_img is not None:
+                    with col_img:
+                        show_thumbnail(p["image_url"], width=THUMB_SIDE)
+                with col_txt:
+                    st.markdown(f"### {p['title']}")
+                    st.caption(f"Kategorija: {p['category']}")
+                    excerpt = p["content"][:300]
+                    st.write(excerpt + ("…" if len(p["content"]) > 300 else ""))
+                    if len(p["content"]) > 300:
+                        with st.expander("Pročitaj cijeli post"):
+                            st.write(p["content"])
+                            if p.get("image_url"):
+                                st.markdown(f"[Slika u punoj veličini]({API.rstrip('/') + p['image_url']})")
+                    if p.get("created_at"):
+                        try:
+                            # backend vraća ISO8601; zamjena Z -> +00:00 je fallback
+                            dt = datetime.fromisoformat(p["created_at"].replace("Z", "+00:00"))
+                            st.caption(f"Objavljeno: {dt.strftime('%d.%m.%Y %H:%M:%S')}")
+                        except Exception:
+                            pass
 
                 c1, c2 = st.columns(2)
                 if st.session_state.token:
@@ -325,12 +437,15 @@ try:
                     with c2:
                         if st.button("🗑️ Obriši", key=f"del_{p['id']}"):
                             try:
-                                rr = requests.delete(f"{API}/posts/{p['id']}", headers=auth_headers(), timeout=20)
+                                rr = http.delete(f"{API}/posts/{p['id']}", headers=auth_headers(), timeout=20)
                                 rr.raise_for_status()
+                                invalidate_cache()
                                 st.toast("Post obrisan ✅")
                                 st.rerun()
                             except Exception as e:
                                 st.error(f"Greška pri brisanju: {e}")
+        if pages > 1:
+            _page_nav(page, pages, "bottom")
 except Exception as e:
     st.error(f"Greška pri dohvaćanju postova: {e}")
 